@@ -0,0 +1,207 @@
+"""Run many CLI commands from JSON lines in one process (`grocery batch`).
+
+Each input line is either a JSON array of CLI arguments:
+    ["resolve", "milk"]
+or an object with an "argv" array (or shell-style string) and an optional "id":
+    {"id": 3, "argv": ["list", "add", "Milk", "--upc", "Milk=0001111041700"]}
+
+Each command produces one JSON result line, in input order:
+    {"id": 3, "argv": [...], "code": 0, "stdout": "...", "stderr": "..."}
+
+Commands share the process's catalog, Kroger client and list state. Consecutive
+`list add` commands are merged into one aisle-sorted insert, consecutive
+`list check` / `list remove` commands share a single list fetch, and consecutive
+`cart add` commands are queued in the outbox and pushed in one coalesced request.
+"""
+
+import json
+import shlex
+
+from . import cli
+
+# Commands that make no sense inside a batch
+_NESTED = {"batch", "serve"}
+# `list` actions that can share one list fetch when they appear back to back
+_COALESCE = {"add", "check", "remove"}
+
+
+def _parse_line(line: str) -> tuple:
+    """Return (id, argv) for one input line. Raises ValueError on malformed input."""
+    data = json.loads(line)
+    cmd_id, argv = None, None
+    if isinstance(data, list):
+        argv = data
+    elif isinstance(data, dict):
+        cmd_id, argv = data.get("id"), data.get("argv")
+    if isinstance(argv, str):
+        argv = shlex.split(argv)
+    if not isinstance(argv, list) or not argv:
+        raise ValueError("expected a JSON array of arguments or an object with 'argv'")
+    return cmd_id, [str(a) for a in argv]
+
+
+def _error(message: str, code: int = 2) -> dict:
+    return {"stdout": "", "stderr": message.rstrip("\n") + "\n", "code": code}
+
+
+def _prepare(lines) -> list[dict]:
+    """Parse input lines into commands: {"id", "argv", "args"} or {"id", "argv", "result"}."""
+    parser = cli.build_parser()
+    commands = []
+    for lineno, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            cmd_id, argv = _parse_line(line)
+        except ValueError as e:
+            commands.append({"id": None, "argv": None,
+                             "result": _error(f"line {lineno}: {e}")})
+            continue
+        cmd = {"id": cmd_id, "argv": argv}
+        parsed = []
+        result = cli.run_captured(argv, func=lambda: parsed.append(parser.parse_args(argv)))
+        if not parsed:
+            cmd["result"] = result
+        elif parsed[0].command in _NESTED or cli._long_running(parsed[0]):
+            name = " ".join(a for a in (parsed[0].command, getattr(parsed[0], "action", None)) if a)
+            cmd["result"] = _error(f"'{name}' cannot run inside a batch")
+        else:
+            cmd["args"] = parsed[0]
+        commands.append(cmd)
+    return commands
+
+
+def _list_action(cmd: dict) -> str | None:
+    args = cmd.get("args")
+    if args is None or args.command != "list" or args.action not in _COALESCE:
+        return None
+    return args.action
+
+
+def _is_cart_add(cmd: dict) -> bool:
+    args = cmd.get("args")
+    return args is not None and args.command == "cart" and args.action == "add" and not args.defer
+
+
+def _groups(commands: list[dict], coalesce: bool = True):
+    """Yield runs of commands; consecutive coalescable `list` actions or cart adds form one run.
+
+    With coalesce=False every command is its own run.
+    """
+    if not coalesce:
+        for cmd in commands:
+            yield [cmd]
+        return
+    i = 0
+    while i < len(commands):
+        action = _list_action(commands[i])
+        j = i + 1
+        if _is_cart_add(commands[i]):
+            while j < len(commands) and _is_cart_add(commands[j]):
+                j += 1
+        elif action:
+            titles = set(commands[i]["args"].items if action == "add" else [])
+            while j < len(commands) and _list_action(commands[j]) == action:
+                if action == "add":
+                    # Notes are keyed by title, so a repeated title can't share the insert.
+                    items = set(commands[j]["args"].items)
+                    if items & titles:
+                        break
+                    titles |= items
+                j += 1
+        yield commands[i:j]
+        i = j
+
+
+def _run_adds(group: list[dict]):
+    from . import tasklist
+
+    titles, notes_map = [], {}
+    for cmd in group:
+        titles += cmd["args"].items
+        notes_map.update(cli._list_add_notes(cmd["args"]))
+    outcomes = []
+    result = cli.run_captured(None, func=lambda: outcomes.extend(
+        tasklist.add_items_sorted(titles, notes_map=notes_map)))
+    if result["code"]:  # the list fetch failed: nothing was added
+        for cmd in group:
+            cmd["result"] = result
+        return
+    # Outcomes are per title, so only the commands whose own adds failed report an error.
+    offset = 0
+    for cmd in group:
+        count = len(cmd["args"].items)
+        chunk = outcomes[offset:offset + count]
+        cmd["result"] = cli.run_captured(None, func=lambda: cli._report_added(cmd["args"], chunk))
+        offset += count
+
+
+def _run_matches(group: list[dict], action: str):
+    from . import tasklist
+
+    titles = [cmd["args"].item for cmd in group]
+    fn = tasklist.check_items if action == "check" else tasklist.remove_items
+    outcomes = []
+    result = cli.run_captured(None, func=lambda: outcomes.extend(fn(titles)))
+    if result["code"]:  # the list fetch failed: nothing was touched
+        for cmd in group:
+            cmd["result"] = result
+        return
+    for cmd, outcome in zip(group, outcomes):
+        cmd["result"] = cli.run_captured(None, func=lambda: cli._report_list_action(action, outcome))
+
+
+def _run_cart_adds(group: list[dict]):
+    """Resolve every command's items, queue them together, then flush once.
+
+    The flush report is appended to the last command's output.
+    """
+    cart_items = []
+    for cmd in group:
+        cmd["result"] = cli.run_captured(None, func=lambda: cart_items.extend(
+            cli._resolve_cart_adds(cmd["args"].items)))
+    if not cart_items:
+        return
+    push = cli.run_captured(None, func=lambda: (cli._queue_cart_adds(cart_items),
+                                                cli._push_outbox("Cart add")))
+    last = group[-1]["result"]
+    last["stdout"] += push["stdout"]
+    last["stderr"] += push["stderr"]
+    last["code"] = last["code"] or push["code"]
+
+
+def _execute(group: list[dict]):
+    pending = [cmd for cmd in group if "result" not in cmd]
+    if not pending:
+        return
+    action = _list_action(pending[0])
+    if _is_cart_add(pending[0]) and len(pending) > 1:
+        _run_cart_adds(pending)
+    elif action == "add" and len(pending) > 1:
+        _run_adds(pending)
+    elif action in ("check", "remove") and len(pending) > 1:
+        _run_matches(pending, action)
+    else:
+        for cmd in pending:
+            cmd["result"] = cli.run_captured(cmd["argv"])
+
+
+def run_lines(lines, out, stop_on_error: bool = False) -> int:
+    """Execute JSON-lines commands and write one JSON result per line to out.
+
+    Returns the number of commands that failed (non-zero exit code). With stop_on_error,
+    commands run one at a time (no coalescing), so nothing after a failure is executed.
+    """
+    commands = _prepare(lines)
+    failed = 0
+    for group in _groups(commands, coalesce=not stop_on_error):
+        _execute(group)
+        for cmd in group:
+            result = cmd["result"]
+            out.write(json.dumps({"id": cmd["id"], "argv": cmd["argv"], **result}) + "\n")
+            out.flush()
+            if result["code"]:
+                failed += 1
+                if stop_on_error:
+                    return failed
+    return failed
@@ -1,28 +1,44 @@
 """Product catalog search with fuzzy matching."""
 
 import json
-from thefuzz import fuzz
+import os
+from . import trace
 from .config import CATALOG_PATH
 
 _catalog = None
+_names = None
+_by_upc = None
+_mtime = None
 
 
 def load_catalog() -> list[dict]:
-    """Load and cache the product catalog."""
-    global _catalog
-    if _catalog is None:
-        with open(CATALOG_PATH) as f:
-            data = json.load(f)
-        _catalog = data["items"]
+    """Load and cache the product catalog. Reloads if the file changed on disk."""
+    global _catalog, _names, _by_upc, _mtime
+    try:
+        mtime = os.stat(CATALOG_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    if _catalog is None or mtime != _mtime:
+        with trace.span("catalog.load"):
+            with open(CATALOG_PATH) as f:
+                data = json.load(f)
+            _catalog = data["items"]
+            _names = [item["name"].lower() for item in _catalog]
+            _by_upc = {item["upc"]: item for item in _catalog}
+            _mtime = mtime
     return _catalog
 
 
+@trace.traced("catalog.search")
 def search(query: str, limit: int = 10) -> list[dict]:
     """Fuzzy search catalog. Returns matches sorted by score, tiebreak by purchaseCount."""
+    from thefuzz import fuzz  # deferred: slow to import and most commands never search
+
     catalog = load_catalog()
+    query = query.lower()
     results = []
-    for item in catalog:
-        score = fuzz.token_set_ratio(query.lower(), item["name"].lower())
+    for item, name in zip(catalog, _names):
+        score = fuzz.token_set_ratio(query, name)
         if score >= 50:
             results.append({**item, "_score": score})
     results.sort(key=lambda x: (-x["_score"], -x.get("purchaseCount", 0)))
@@ -31,11 +47,8 @@ def search(query: str, limit: int = 10) -> list[dict]:
 
 def get_by_upc(upc: str) -> dict | None:
     """Look up a catalog item by exact UPC. Returns item dict or None."""
-    catalog = load_catalog()
-    for item in catalog:
-        if item["upc"] == upc:
-            return item
-    return None
+    load_catalog()
+    return _by_upc.get(upc)
 
 
 def resolve_item(name: str) -> dict | None:
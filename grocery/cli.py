@@ -3,7 +3,10 @@
 
 import sys
 import os
+import io
+import time
 import argparse
+import contextlib
 
 
 def cmd_list(args):
@@ -26,52 +29,61 @@ def cmd_list(args):
         print()
 
     elif args.action == "add":
-        # Build notes_map from --upc and --qty flags
-        notes_map = {}
-        upcs = getattr(args, 'upcs', None) or []
-        qty = getattr(args, 'qty', 1) or 1
-        upc_map = {}
-        for upc_pair in upcs:
-            if "=" in upc_pair:
-                item_name, upc_code = upc_pair.split("=", 1)
-                upc_map[item_name] = upc_code
-        for item_name in args.items:
-            upc = upc_map.get(item_name)
-            notes = tasklist.build_notes(upc=upc, qty=qty)
-            if notes:
-                notes_map[item_name] = notes
-        
-        added = tasklist.add_items_sorted(args.items, notes_map=notes_map)
-        for task in added:
-            title = task.get("title", "?")
-            notes = task.get("notes", "")
-            upc_str = f" [{notes}]" if notes else ""
-            print(f"  + Added: {title}{upc_str}")
-        print(f"\n{len(added)} item(s) added.")
+        notes_map = _list_add_notes(args)
+        _report_added(args, tasklist.add_items_sorted(args.items, notes_map=notes_map))
 
     elif args.action == "remove":
-        try:
-            title = tasklist.remove_item(args.item)
-            print(f"  + Removed: {title}")
-        except ValueError as e:
-            print(f"  x {e}")
-            sys.exit(1)
+        _report_list_action("remove", tasklist.remove_items([args.item])[0])
 
     elif args.action == "check":
+        _report_list_action("check", tasklist.check_items([args.item])[0])
+
+    elif args.action == "uncheck":
         try:
-            title = tasklist.check_item(args.item)
-            print(f"  + Checked off: {title}")
+            title = tasklist.uncheck_item(args.item)
+            print(f"  + Unchecked: {title}")
         except ValueError as e:
             print(f"  x {e}")
             sys.exit(1)
 
-    elif args.action == "uncheck":
+    elif args.action == "migrate":
+        from . import migrations
+        if not args.name:
+            print("-- Registered migrations:\n")
+            for name, info in sorted(migrations.MIGRATIONS.items()):
+                print(f"  {name:<12} {info['description']}")
+            print()
+            return
         try:
-            title = tasklist.uncheck_item(args.item)
-            print(f"  + Unchecked: {title}")
+            tasks, pending, resumed = migrations.prepare(args.name, restart=args.restart)
         except ValueError as e:
             print(f"  x {e}")
             sys.exit(1)
+        label = "Dry run" if args.dry_run else "Migrating"
+        resumed_str = f" ({resumed} already done in an interrupted run)" if resumed else ""
+        print(f"-- {label} '{args.name}': {len(pending)} of {len(tasks)} task(s) to update{resumed_str}\n")
+        if args.dry_run:
+            for line in migrations.diff(tasks, pending):
+                print(line)
+            print()
+            return
+        applied, errors = migrations.apply(args.name, pending, workers=args.workers,
+                                           log=lambda line: print(line, flush=True))
+        print(f"\nMigrated {applied} item(s).")
+        if errors:
+            print(f"  x {len(errors)} update(s) failed; re-run to resume from the checkpoint.")
+            sys.exit(1)
+
+    elif args.action == "watch":
+        from . import watch
+        mode = "once" if args.once else f"every {args.interval:g}s (backoff to {args.max_interval:g}s)"
+        print(f"-- Watching grocery list {mode}{', pinning UPCs' if args.pin else ''}. Ctrl-C to stop.")
+        try:
+            watch.watch(_resolve_task, interval=args.interval, max_interval=args.max_interval,
+                        settle=args.settle, pin=args.pin, once=args.once,
+                        log=lambda line: print(line, flush=True))
+        except KeyboardInterrupt:
+            print("\n  Stopped watching.")
 
     elif args.action == "clear":
         count = tasklist.clear_completed()
@@ -81,6 +93,72 @@ def cmd_list(args):
             print("  No completed items to clear.")
 
 
+def _list_add_upcs(args) -> dict:
+    """Parse `list add --upc ITEM=UPC` flags into a title -> UPC map."""
+    upc_map = {}
+    for upc_pair in getattr(args, 'upcs', None) or []:
+        if "=" in upc_pair:
+            item_name, upc_code = upc_pair.split("=", 1)
+            upc_map[item_name] = upc_code
+    return upc_map
+
+
+def _remember_pins(args):
+    """A UPC pinned at add time is a user-confirmed choice — teach it to the memory."""
+    from . import memory
+
+    upc_map = _list_add_upcs(args)
+    pins = [{"original": title, "upc": upc, "name": None}
+            for title, upc in upc_map.items() if title in args.items]
+    if pins:
+        _remember(pins, weight=memory.WEIGHT_CONFIRMED)
+
+
+def _list_add_notes(args) -> dict:
+    """Build the title -> notes map for `list add` from its --upc and --qty flags."""
+    from . import tasklist
+
+    notes_map = {}
+    qty = getattr(args, 'qty', 1) or 1
+    upc_map = _list_add_upcs(args)
+    for item_name in args.items:
+        upc = upc_map.get(item_name)
+        notes = tasklist.build_notes(upc=upc, qty=qty)
+        if notes:
+            notes_map[item_name] = notes
+    return notes_map
+
+
+def _print_added(added: list[dict]):
+    for task in added:
+        title = task.get("title", "?")
+        notes = task.get("notes", "")
+        upc_str = f" [{notes}]" if notes else ""
+        print(f"  + Added: {title}{upc_str}")
+    print(f"\n{len(added)} item(s) added.")
+
+
+def _report_added(args, outcomes: list):
+    """Print the tasks a `list add` created, then raise the first failed add, if any."""
+    _print_added([t for t in outcomes if not isinstance(t, Exception)])
+    _remember_pins(args)
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            raise outcome
+
+
+def _report_list_action(action: str, outcome):
+    """Print the result of a remove/check: matched title, ValueError (exits 1), or re-raise
+    the RuntimeError of a failed gog call."""
+    if isinstance(outcome, ValueError):
+        print(f"  x {outcome}")
+        sys.exit(1)
+    if isinstance(outcome, Exception):
+        raise outcome
+    label = "Removed" if action == "remove" else "Checked off"
+    print(f"  + {label}: {outcome}")
+
+
 def cmd_search(args):
     """Search the product catalog."""
     from . import catalog
@@ -124,17 +202,101 @@ def _parse_upc_from_notes(notes: str) -> str | None:
     return None
 
 
-def _resolve_list_items(items):
-    """Resolve list items against catalog and optionally API.
-    
+def _resolve_item(title: str, notes: str) -> dict | None:
+    """Resolve one list item. Returns a resolution dict, or None if nothing matched.
+
     Resolution order:
     1. Check task notes for pre-resolved UPC (set at add time) -> use directly
-    2. Fuzzy match against local catalog (threshold 70+)
-    3. Fallback to Kroger product API
+    2. Learned memory of what this title resolved to before (confidence threshold)
+    3. Fuzzy match against local catalog (threshold 70+)
+    4. Fallback to Kroger product API
     """
     from . import catalog
     from . import kroger
+    from . import memory
+    from . import tasklist as tl
+
+    notes_data = tl.parse_notes(notes)
+    qty = notes_data["qty"]
+    pinned_upc = notes_data["upc"]
+    if pinned_upc:
+        cat_item = catalog.get_by_upc(pinned_upc)
+        name = cat_item["name"] if cat_item else title
+        return {
+            "upc": pinned_upc,
+            "name": name,
+            "quantity": qty,
+            "source": "pinned",
+            "score": 100,
+            "purchaseCount": cat_item.get("purchaseCount", 0) if cat_item else 0,
+            "original": title,
+        }
+
+    # 2. Learned memory
+    remembered = memory.lookup(title)
+    if remembered:
+        cat_item = catalog.get_by_upc(remembered["upc"])
+        return {
+            "upc": remembered["upc"],
+            "name": cat_item["name"] if cat_item else remembered["name"],
+            "quantity": qty,
+            "source": "memory",
+            "score": round(remembered["confidence"] * 100),
+            "purchaseCount": cat_item.get("purchaseCount", 0) if cat_item else 0,
+            "original": title,
+        }
+
+    # 3. Fuzzy match against catalog
+    results = catalog.search(title, limit=5)
+    if results and results[0]["_score"] >= 70:
+        match = results[0]
+        return {
+            "upc": match["upc"],
+            "name": match["name"],
+            "quantity": qty,
+            "source": "catalog",
+            "score": match["_score"],
+            "purchaseCount": match.get("purchaseCount", 0),
+            "original": title,
+        }
+
+    # 4. Fallback: search Kroger product API
+    try:
+        api_results = kroger.search_products(title, limit=1)
+    except Exception:
+        return None
+    if not api_results:
+        return None
+    top = api_results[0]
+    return {
+        "upc": top["upc"],
+        "name": top.get("description", title),
+        "quantity": qty,
+        "source": "api",
+        "score": None,
+        "purchaseCount": 0,
+        "original": title,
+    }
+
+
+def _resolve_task(item: dict) -> dict | None:
+    """Resolve one Google Tasks item, tagging the result with its task_id.
+
+    Unchanged tasks already pre-resolved by `grocery list watch` skip resolution.
+    """
+    from . import watch
+
+    result = watch.lookup(item) or _resolve_item(item.get("title", "").strip(), item.get("notes", ""))
+    if result:
+        result["task_id"] = item.get("id")
+    return result
+
+
+def _resolve_list_items(items):
+    """Resolve list items against pinned UPCs, memory, catalog and optionally API.
 
+    Returns (resolved, unresolved_titles). See _resolve_item for the order.
+    """
     resolved = []
     unresolved = []
 
@@ -142,79 +304,166 @@ def _resolve_list_items(items):
         title = item.get("title", "").strip()
         if not title:
             continue
-        
-        # Parse notes for UPC and quantity
-        from . import tasklist as tl
-        notes = item.get("notes", "")
-        notes_data = tl.parse_notes(notes)
-        qty = notes_data["qty"]
-        pinned_upc = notes_data["upc"]
-        if pinned_upc:
-            cat_item = catalog.get_by_upc(pinned_upc)
-            name = cat_item["name"] if cat_item else title
-            resolved.append({
-                "upc": pinned_upc,
-                "name": name,
-                "quantity": qty,
-                "source": "pinned",
-                "score": 100,
-                "purchaseCount": cat_item.get("purchaseCount", 0) if cat_item else 0,
-                "original": title,
-            })
-            continue
-        
-        # 2. Fuzzy match against catalog
-        results = catalog.search(title, limit=5)
-        if results and results[0]["_score"] >= 70:
-            match = results[0]
-            resolved.append({
-                "upc": match["upc"],
-                "name": match["name"],
-                "quantity": qty,
-                "source": "catalog",
-                "score": match["_score"],
-                "purchaseCount": match.get("purchaseCount", 0),
-                "original": title,
-            })
+        result = _resolve_task(item)
+        if result:
+            resolved.append(result)
         else:
-            # 3. Fallback: search Kroger product API
-            try:
-                api_results = kroger.search_products(title, limit=1)
-                if api_results:
-                    top = api_results[0]
-                    resolved.append({
-                        "upc": top["upc"],
-                        "name": top.get("description", title),
-                        "quantity": qty,
-                        "source": "api",
-                        "score": None,
-                        "purchaseCount": 0,
-                        "original": title,
-                    })
-                else:
-                    unresolved.append(title)
-            except Exception:
-                unresolved.append(title)
+            unresolved.append(title)
 
     return resolved, unresolved
 
 
+def _remember(resolved: list[dict], weight: float = None):
+    """Record pushed resolutions in the learned memory (best effort)."""
+    from . import memory
+    try:
+        memory.record([(r["original"], r["upc"], r["name"]) for r in resolved if r.get("original")],
+                      weight=weight or memory.WEIGHT_SYNC)
+    except (OSError, ValueError) as e:
+        print(f"  ! Could not update resolution memory: {e}")
+
+
+def _resolve_cart_adds(names: list[str]) -> list[dict]:
+    """Resolve `cart add` names (memory, then catalog), printing one line per name."""
+    from . import catalog, memory
+
+    cart_items = []
+    for name in names:
+        match = memory.lookup(name) or catalog.resolve_item(name)
+        if match:
+            cart_items.append({"upc": match["upc"], "name": match["name"], "quantity": 1,
+                               "original": name})
+            print(f"  + {match['name']} (UPC: {match['upc']})")
+        else:
+            print(f"  x No catalog match for '{name}'")
+    return cart_items
+
+
+def _queue_cart_adds(items: list[dict], sync: bool = False) -> int:
+    """Write resolved cart items to the outbox before any network call. Returns queue length.
+
+    sync=True marks list sync items, which replace their own earlier queued entries.
+    """
+    from . import outbox
+    return outbox.enqueue(items, sync=sync)
+
+
+def _push_outbox(label: str, out=None) -> bool:
+    """Flush the outbox in one coalesced POST and report it. Returns True on success."""
+    from . import outbox
+    out = out or sys.stdout
+    try:
+        result = outbox.flush()
+    except (OSError, ValueError) as e:
+        print(f"\nx {label} failed: cannot read outbox: {e}", file=out)
+        return False
+    return _report_flush(label, result, out)
+
+
+def _report_flush(label: str, result: dict, out=None) -> bool:
+    """Print one outbox.flush() result and remember what was delivered."""
+    out = out or sys.stdout
+    if result["error"]:
+        print(f"\nx {label} failed: {result['error']}", file=out)
+        print(f"  {result['entries']} cart add(s) kept in the outbox. "
+              "Retry with: grocery cart flush (or just run the next command)", file=out)
+        return False
+    if not result["entries"]:
+        return True
+    merged = result["entries"] - result["items"]
+    merged_str = f" ({merged} duplicate add(s) coalesced)" if merged else ""
+    requests_str = f" in {result['requests']} requests" if result.get("requests", 1) > 1 else ""
+    print(f"\n+ {result['items']} item(s) added to cart{requests_str}{merged_str}.", file=out)
+    _remember(result["flushed"])
+    return True
+
+
+def _report_pushes(label: str, pushes: list[dict]) -> bool:
+    """Report the chunked pushes of a pipelined sync as one outcome."""
+    delivered = [p for p in pushes if not p["error"]]
+    ok = _report_flush(label, {
+        "entries": sum(p["entries"] for p in delivered),
+        "items": sum(p["items"] for p in delivered),
+        "flushed": [e for p in delivered for e in p["flushed"]],
+        "requests": len(delivered),
+        "error": None,
+    })
+    if pushes and pushes[-1]["error"]:
+        # Earlier failed chunks were retried by later flushes; only the last one can remain.
+        return _report_flush(label, pushes[-1])
+    return ok
+
+
+# Commands that don't flush queued cart adds first: `cart` pushes the queue itself,
+# dry runs must not touch the cart, and auth may be what fixes a failing flush.
+_NO_AUTOFLUSH = {"cart", "auth", "serve", "batch", "metrics", "households"}
+
+
+def _autoflush(args):
+    """Push cart adds left queued by an earlier failure or `cart add --defer`.
+
+    After a failed flush, retries wait GROCERY_OUTBOX_RETRY_SECONDS, doubling per attempt.
+    """
+    from . import outbox
+    if args.command in _NO_AUTOFLUSH or getattr(args, 'dry_run', False) \
+            or getattr(args, 'action', None) == "watch" or not outbox.has_pending():
+        return
+    box = outbox.status()
+    wait = outbox.next_retry(box) - time.time()
+    if wait > 0:
+        print(f"  ! {len(box['entries'])} cart add(s) queued; next automatic retry in {int(wait) + 1}s "
+              f"(grocery cart flush to retry now)", file=sys.stderr)
+        return
+    _push_outbox("Queued cart flush", out=sys.stderr)
+
+
 def cmd_cart(args):
     """Kroger cart operations."""
-    from . import tasklist
-    from . import kroger
-    from . import catalog as cat_mod
-
     if args.action == "sync":
-        items = tasklist.get_items(include_completed=False)
-        if not items:
-            print("Grocery list is empty — nothing to sync.")
-            return
-
-        resolved, unresolved = _resolve_list_items(items)
+        plan_path = getattr(args, 'plan', None)
+        save_plan = getattr(args, 'save_plan', None)
+        if save_plan and not getattr(args, 'dry_run', False):
+            print("  x --save-plan requires --dry-run")
+            sys.exit(2)
+
+        pushes = None
+        if plan_path:
+            from . import plan
+            from . import tasklist
+            items = tasklist.get_items(include_completed=False)
+            if not items:
+                print("Grocery list is empty — nothing to sync.")
+                return
+            try:
+                saved = plan.load(plan_path)
+            except (OSError, ValueError) as e:
+                print(f"  x Cannot use plan {plan_path}: {e}")
+                sys.exit(1)
+            resolved, unresolved, stats = plan.apply(saved, items, _resolve_task)
+            print(f"-- Plan {plan_path} (from {saved.get('createdAt', '?')}): "
+                  f"{stats['reused']} reused, {stats['rechecked']} rechecked, {stats['changed']} changed, "
+                  f"{stats['new']} new, {stats['dropped']} no longer on list")
+            for title in stats["reresolved"]:
+                print(f"  ! Re-resolved since plan: {title}")
+            print()
+        else:
+            # List fetch, catalog load and auth overlap; a real sync pushes cart chunks
+            # while later items are still resolving.
+            from . import pipeline
+            synced = pipeline.sync(_resolve_task, push=not getattr(args, 'dry_run', False))
+            items = synced["items"]
+            if not items:
+                print("Grocery list is empty — nothing to sync.")
+                return
+            resolved, unresolved, pushes = synced["resolved"], synced["unresolved"], synced["pushes"]
         total = len(resolved) + len(unresolved)
 
         if getattr(args, 'dry_run', False):
+            from . import products
+            local_images = {}
+            if getattr(args, 'prefetch_images', False):
+                # Everything except pinned items may need visual confirmation
+                local_images = _prefetch_images([r['upc'] for r in resolved if r['source'] != 'pinned'])
             print(f"-- Dry Run — {total} items to sync:\n")
             for r in resolved:
                 score_str = f"{r['score']}%" if r['score'] is not None else "N/A"
@@ -222,26 +471,38 @@ def cmd_cart(args):
                 if r['source'] == 'pinned':
                     print(f"  * {r['original']}{qty_str} -> {r['name']} (UPC: {r['upc']})")
                     print(f"    Source: pinned (pre-resolved) | Purchased: {r['purchaseCount']}x")
+                elif r['source'] == 'memory':
+                    print(f"  ~ {r['original']}{qty_str} -> {r['name']} (UPC: {r['upc']})")
+                    print(f"    Confidence: {score_str} | Source: memory (resolved before) | Purchased: {r['purchaseCount']}x")
                 elif r['source'] == 'catalog':
                     print(f"  + {r['original']}{qty_str} -> {r['name']} (UPC: {r['upc']})")
                     print(f"    Score: {score_str} | Source: catalog | Purchased: {r['purchaseCount']}x")
                 else:
                     print(f"  ! {r['original']}{qty_str} -> {r['name']} (UPC: {r['upc']})")
                     print(f"    Score: {score_str} | Source: api (not in catalog)")
+                details = products.describe(r['upc'])
+                if details:
+                    print(f"    {details}")
+                if r['upc'] in local_images:
+                    print(f"    Image: {local_images[r['upc']]}")
             for name in unresolved:
                 print(f"  x {name} -> No match found")
             print()
+            if save_plan:
+                from . import plan
+                plan.save(save_plan, items, resolved)
+                print(f"  + Plan saved to {save_plan}. Push it with: grocery cart sync --plan {save_plan}")
             return
 
         if resolved:
             print(f"-- Syncing {len(resolved)} item(s) to Kroger cart...\n")
             for r in resolved:
                 print(f"  + {r['name']} (UPC: {r['upc']})")
-            try:
-                kroger.add_to_cart(resolved)
-                print(f"\n+ {len(resolved)} item(s) added to cart.")
-            except Exception as e:
-                print(f"\nx Cart sync failed: {e}")
+            if pushes is None:
+                _queue_cart_adds(resolved, sync=True)
+                _push_outbox("Cart sync")
+            else:
+                _report_pushes("Cart sync", pushes)
 
         if unresolved:
             print(f"\n! Could not resolve {len(unresolved)} item(s):")
@@ -249,34 +510,78 @@ def cmd_cart(args):
                 print(f"  • {name}")
 
     elif args.action == "add":
-        cart_items = []
-        for name in args.items:
-            match = cat_mod.resolve_item(name)
-            if match:
-                cart_items.append({"upc": match["upc"], "name": match["name"], "quantity": 1})
-                print(f"  + {match['name']} (UPC: {match['upc']})")
-            else:
-                print(f"  x No catalog match for '{name}'")
-
+        cart_items = _resolve_cart_adds(args.items)
         if cart_items:
-            try:
-                kroger.add_to_cart(cart_items)
-                print(f"\n+ {len(cart_items)} item(s) added to Kroger cart.")
-            except Exception as e:
-                print(f"\nx Cart add failed: {e}")
+            queued = _queue_cart_adds(cart_items)
+            if getattr(args, 'defer', False):
+                print(f"\n+ {len(cart_items)} item(s) queued ({queued} in outbox). "
+                      "Push with: grocery cart flush")
+            else:
+                _push_outbox("Cart add")
+
+    elif args.action == "flush":
+        from . import outbox
+        box = outbox.status()
+        if getattr(args, 'list', False):
+            if not box["entries"]:
+                print("Outbox is empty.")
+                return
+            now = time.time()
+            print(f"-- Outbox — {len(box['entries'])} queued cart add(s):\n")
+            for entry in box["entries"]:
+                qty_str = f" x{entry['quantity']}" if entry['quantity'] > 1 else ""
+                age = int(now - entry["queuedAt"])
+                print(f"  {entry.get('name') or entry['upc']}{qty_str} (UPC: {entry['upc']}) — queued {age}s ago")
+            if box.get("lastError"):
+                print(f"\n  ! Last flush failed ({box.get('attempts', 1)} attempt(s)): {box['lastError']['message']}")
+                wait = outbox.next_retry(box) - now
+                if wait > 0:
+                    print(f"    Next automatic retry in {int(wait) + 1}s")
+            print()
+            return
+        if not box["entries"]:
+            print("Outbox is empty — nothing to flush.")
+            return
+        print(f"-- Flushing {len(box['entries'])} queued cart add(s)...")
+        if not _push_outbox("Cart flush"):
+            sys.exit(1)
 
     else:
-        print("Usage: grocery cart [sync|add]")
+        print("Usage: grocery cart [sync|add|flush]")
 
 
 def cmd_resolve(args):
     """Resolve a query against catalog and optionally Kroger API."""
     from . import catalog
+    from . import memory
+    from . import products
 
     query = " ".join(args.query)
+
+    if getattr(args, 'remember', None):
+        cat_item = catalog.get_by_upc(args.remember)
+        name = cat_item["name"] if cat_item else None
+        _remember([{"original": query, "upc": args.remember, "name": name}],
+                  weight=memory.WEIGHT_CONFIRMED)
+        print(f"  + Remembered: '{query}' -> {name or args.remember} (UPC: {args.remember})")
+        return
+    if getattr(args, 'forget', False):
+        if memory.forget(query):
+            print(f"  + Forgot resolutions for '{query}'")
+        else:
+            print(f"  Nothing remembered for '{query}'.")
+        return
+
     results = catalog.search(query, limit=5)
 
     print(f"-- Resolving '{query}':\n")
+    remembered = memory.lookup(query, min_confidence=0)
+    if remembered:
+        confidence = round(remembered["confidence"] * 100)
+        cat_item = catalog.get_by_upc(remembered["upc"])
+        name = cat_item["name"] if cat_item else remembered["name"]
+        print(f"  Remembered: {name} (UPC: {remembered['upc']})")
+        print(f"      Confidence: {confidence}% (used in sync at {memory.MEMORY_MIN_CONFIDENCE:.0%}+)\n")
     if results:
         print("  Catalog matches:")
         for item in results:
@@ -284,14 +589,19 @@ def cmd_resolve(args):
             count = item.get("purchaseCount", 0)
             print(f"    {item['name']} (UPC: {item['upc']})")
             print(f"      Score: {score}% | Purchased: {count}x")
+            details = products.describe(item['upc'])
+            if details:
+                print(f"      {details}")
     else:
         print("  No catalog matches.")
 
+    api_results = []
     if getattr(args, 'api', False):
         from . import kroger
         print("\n  Kroger API results:")
         try:
             api_results = kroger.search_products(query, limit=5)
+            products.remember(api_results)
             if api_results:
                 for p in api_results:
                     desc = p.get("description", "?")
@@ -315,6 +625,14 @@ def cmd_resolve(args):
                 print("    No API results.")
         except Exception as e:
             print(f"    API error: {e}")
+
+    if getattr(args, 'prefetch_images', False):
+        candidates = [item['upc'] for item in results] + [p['upc'] for p in api_results if p.get('upc')]
+        local_images = _prefetch_images(candidates)
+        if local_images:
+            print("\n  Local images:")
+            for upc, path in local_images.items():
+                print(f"    {upc}: {path}")
     print()
 
 
@@ -358,8 +676,93 @@ def cmd_catalog_sub(args):
 
         cat_mod._catalog = None
         print(f"  Catalog now has {len(data['items'])} items.")
+    elif args.catalog_action == "hydrate":
+        from . import catalog as cat_mod
+        from . import products
+
+        upcs = args.upcs or [item["upc"] for item in cat_mod.load_catalog()]
+        print(f"-- Hydrating {len(upcs)} UPC(s)...")
+        try:
+            stats = products.hydrate(upcs, force=args.force, workers=args.workers)
+        except RuntimeError as e:
+            print(f"  x {e}")
+            sys.exit(1)
+        print(f"  + {stats['fetched']} fetched in {stats['pages']} request(s), "
+              f"{stats['fresh']} already fresh, {stats['missing']} unknown to the API")
+        for error in stats["errors"]:
+            print(f"  x Request failed: {error}")
+        if stats["errors"]:
+            sys.exit(1)
+    else:
+        print("Usage: grocery catalog [add|hydrate]")
+
+
+def _prefetch_images(upcs: list[str]) -> dict:
+    """Download candidate images into the local cache. Returns {upc: local path}."""
+    from . import images
+
+    if not upcs:
+        return {}
+    results = images.fetch(upcs)
+    failed = [r for r in results if r["error"]]
+    if failed:
+        print(f"  ! {len(failed)} image(s) could not be fetched")
+    return {r["upc"]: r["path"] for r in results if r["path"]}
+
+
+def cmd_images(args):
+    """Product image cache."""
+    from . import images
+
+    if args.action == "fetch":
+        results = images.fetch(args.upcs, size=args.size, perspective=args.perspective,
+                               force=args.force)
+        for r in results:
+            if r["error"]:
+                print(f"  x {r['upc']}: {r['error']}")
+            else:
+                where = "cached" if r["cached"] else "downloaded"
+                print(f"  + {r['upc']} -> {r['path']} ({where})")
+        if any(r["error"] for r in results):
+            sys.exit(1)
     else:
-        print("Usage: grocery catalog [add]")
+        print("Usage: grocery images fetch <UPC...>")
+
+
+def cmd_households(args):
+    """Sync many households from a manifest with forked, isolated workers."""
+    from . import households
+
+    if args.action != "sync":
+        print("Usage: grocery households sync <MANIFEST> [--workers N] [--dry-run]")
+        return
+    try:
+        manifest = households.load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"  x Cannot load manifest {args.manifest}: {e}")
+        sys.exit(1)
+
+    mode = "Dry run" if args.dry_run else "Syncing"
+    print(f"-- {mode}: {len(manifest)} household(s)\n")
+    summary = None
+    for result in households.sync_all(manifest, workers=args.workers, dry_run=args.dry_run):
+        if result.get("summary"):
+            summary = result
+            continue
+        if result["ok"]:
+            pushed = f", {result['pushed']} pushed" if not args.dry_run else ""
+            print(f"  + {result['name']}: {result['resolved']} resolved, "
+                  f"{len(result['unresolved'])} unresolved{pushed} ({result['seconds']:.1f}s)")
+            for title in result["unresolved"]:
+                print(f"      x {title}")
+        else:
+            print(f"  x {result['name']}: {result['error']} ({result['seconds']:.1f}s)")
+        sys.stdout.flush()
+
+    print(f"\n-- {summary['ok']}/{summary['households']} household(s) OK with {summary['workers']} worker(s) "
+          f"in {summary['seconds']:.1f}s — {summary['per_minute']:.1f} households/min")
+    if summary["failed"]:
+        sys.exit(1)
 
 
 def cmd_auth(args):
@@ -377,8 +780,69 @@ def cmd_auth(args):
         print("Step 2: Run: grocery auth exchange <CODE_OR_REDIRECT_URL>")
 
 
-def main():
+def cmd_serve(args):
+    """Run or stop the resident daemon."""
+    from . import server
+    if args.stop:
+        if server.stop(args.socket):
+            print("  + Daemon stopped.")
+        else:
+            print("  No daemon running.")
+        return
+    try:
+        server.serve(args.socket)
+    except RuntimeError as e:
+        print(f"  x {e}")
+        sys.exit(1)
+
+
+def cmd_metrics(args):
+    """Summarize recorded --trace runs per span, to spot trends across runs."""
+    from . import trace
+
+    runs = trace.load_metrics(command=args.cmd)[-args.n:]
+    if not runs:
+        print("No traced runs recorded. Run a command with --trace first.")
+        return
+    label = f"'{args.cmd}'" if args.cmd else "all commands"
+    print(f"-- Metrics for {label} (last {len(runs)} run(s)):\n")
+    totals = [r["total_ms"] for r in runs]
+    print(f"  {'span':<32} {'calls':>6} {'avg ms':>9} {'max ms':>9} {'last ms':>9}")
+    print(f"  {'(whole command)':<32} {len(runs):>6} {sum(totals) / len(totals):>9.1f} "
+          f"{max(totals):>9.1f} {totals[-1]:>9.1f}")
+    names = sorted({name for r in runs for name in r["spans"]})
+    for name in names:
+        stats = [r["spans"][name] for r in runs if name in r["spans"]]
+        calls = sum(m["count"] for m in stats)
+        total = sum(m["total_ms"] for m in stats)
+        peak = max(m["max_ms"] for m in stats)
+        last = runs[-1]["spans"].get(name)
+        last_str = f"{last['total_ms']:.1f}" if last else "-"
+        print(f"  {name:<32} {calls:>6} {total / calls:>9.1f} {peak:>9.1f} {last_str:>9}")
+    print()
+
+
+def cmd_batch(args):
+    """Run JSON-lines commands from a file or stdin in one process."""
+    from . import batch
+
+    if args.file == "-":
+        failed = batch.run_lines(sys.stdin, sys.stdout, stop_on_error=args.stop_on_error)
+    else:
+        try:
+            with open(args.file) as f:
+                failed = batch.run_lines(f, sys.stdout, stop_on_error=args.stop_on_error)
+        except OSError as e:
+            print(f"  x Cannot read {args.file}: {e.strerror}")
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="grocery", description="Grocery list, catalog & cart CLI")
+    parser.add_argument("--trace", action="store_true",
+                        help="Print a timing tree and record trace/metrics files")
     subparsers = parser.add_subparsers(dest="command")
 
     # list
@@ -402,6 +866,21 @@ def main():
 
     list_sub.add_parser("clear", help="Clear completed items")
 
+    migrate_p = list_sub.add_parser("migrate", help="Run a registered bulk list migration")
+    migrate_p.add_argument("name", nargs="?", help="Migration name (omit to list them)")
+    migrate_p.add_argument("--dry-run", action="store_true", help="Show the diff without updating")
+    migrate_p.add_argument("--workers", type=int, default=4, help="Concurrent updates (default 4)")
+    migrate_p.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+
+    watch_p = list_sub.add_parser("watch", help="Poll the list and pre-resolve new/changed items")
+    watch_p.add_argument("--interval", type=float, default=30, help="Seconds between polls (default 30)")
+    watch_p.add_argument("--max-interval", type=float, default=300,
+                         help="Idle backoff ceiling in seconds (default 300)")
+    watch_p.add_argument("--settle", type=float, default=5,
+                         help="Wait this long for a burst of edits to finish (default 5)")
+    watch_p.add_argument("--pin", action="store_true", help="Write catalog and memory matches' UPCs into task notes")
+    watch_p.add_argument("--once", action="store_true", help="Poll and pre-resolve once, then exit")
+
     # search
     search_parser = subparsers.add_parser("search", help="Search product catalog")
     search_parser.add_argument("query", nargs="+")
@@ -415,19 +894,40 @@ def main():
     cat_add_p = cat_sub.add_parser("add", help="Add a product to the catalog")
     cat_add_p.add_argument("--upc", required=True, help="Product UPC")
     cat_add_p.add_argument("--name", required=True, help="Product name")
+    cat_hyd_p = cat_sub.add_parser("hydrate", help="Fetch brand/size/price/aisle/images for catalog UPCs")
+    cat_hyd_p.add_argument("--upc", dest="upcs", action="append", metavar="UPC",
+                           help="Only these UPCs (repeatable; default: whole catalog)")
+    cat_hyd_p.add_argument("--force", action="store_true", help="Refetch even fresh entries")
+    cat_hyd_p.add_argument("--workers", type=int, help="Concurrent requests (default: GROCERY_HYDRATE_WORKERS)")
 
     # cart
     cart_parser = subparsers.add_parser("cart", help="Kroger cart operations")
     cart_sub = cart_parser.add_subparsers(dest="action")
     sync_p = cart_sub.add_parser("sync", help="Sync list to Kroger cart")
     sync_p.add_argument("--dry-run", action="store_true", help="Show what would sync without pushing to Kroger")
+    sync_p.add_argument("--save-plan", metavar="FILE",
+                        help="With --dry-run: save the resolutions for a later --plan sync")
+    sync_p.add_argument("--plan", metavar="FILE",
+                        help="Push a saved plan, re-resolving only tasks changed since it was written")
+    sync_p.add_argument("--prefetch-images", action="store_true",
+                        help="With --dry-run: download front images of non-pinned matches to the local cache")
     cart_add = cart_sub.add_parser("add", help="Add items directly to cart")
     cart_add.add_argument("items", nargs="+")
+    cart_add.add_argument("--defer", action="store_true",
+                          help="Only queue in the outbox; push later with `cart flush`")
+    flush_p = cart_sub.add_parser("flush", help="Push queued cart adds in one coalesced request")
+    flush_p.add_argument("--list", action="store_true", help="Show the queue without pushing")
 
     # resolve
     resolve_parser = subparsers.add_parser("resolve", help="Resolve a query against catalog/API")
     resolve_parser.add_argument("query", nargs="+")
     resolve_parser.add_argument("--api", action="store_true", help="Also search Kroger product API")
+    resolve_parser.add_argument("--prefetch-images", action="store_true",
+                                help="Download front images of all candidates to the local cache")
+    resolve_parser.add_argument("--remember", metavar="UPC",
+                                help="Record that the user confirmed UPC for this query")
+    resolve_parser.add_argument("--forget", action="store_true",
+                                help="Drop learned resolutions for this query")
 
     # auth
     auth_parser = subparsers.add_parser("auth", help="Authenticate with Kroger")
@@ -436,7 +936,48 @@ def main():
     exchange_p = auth_sub.add_parser("exchange", help="Exchange auth code for tokens")
     exchange_p.add_argument("code", help="Authorization code or full redirect URL")
 
-    args = parser.parse_args()
+    # images
+    images_parser = subparsers.add_parser("images", help="Product image cache")
+    images_sub = images_parser.add_subparsers(dest="action")
+    img_fetch_p = images_sub.add_parser("fetch", help="Download product images into the local cache")
+    img_fetch_p.add_argument("upcs", nargs="+", metavar="UPC")
+    img_fetch_p.add_argument("--size", default="large",
+                             choices=["thumbnail", "small", "medium", "large", "xlarge"])
+    img_fetch_p.add_argument("--perspective", default="front",
+                             choices=["front", "back", "left", "right", "top", "bottom"])
+    img_fetch_p.add_argument("--force", action="store_true", help="Re-download even if cached")
+
+    # households
+    hh_parser = subparsers.add_parser("households", help="Sync many households from a manifest")
+    hh_sub = hh_parser.add_subparsers(dest="action")
+    hh_sync_p = hh_sub.add_parser("sync", help="Sync every household's list to its cart")
+    hh_sync_p.add_argument("manifest", help="JSON manifest of household configs")
+    hh_sync_p.add_argument("--workers", type=int, help="Concurrent worker processes (default: CPU count)")
+    hh_sync_p.add_argument("--dry-run", action="store_true", help="Resolve only, don't push to carts")
+
+    # serve
+    serve_parser = subparsers.add_parser("serve", help="Run the resident daemon (keeps state warm)")
+    serve_parser.add_argument("--socket", help="Unix socket path (default: GROCERY_SOCKET)")
+    serve_parser.add_argument("--stop", action="store_true", help="Stop a running daemon")
+
+    # metrics
+    metrics_parser = subparsers.add_parser("metrics", help="Summarize timings from --trace runs")
+    metrics_parser.add_argument("cmd", nargs="?", help="Only runs of this command (e.g. 'cart sync')")
+    metrics_parser.add_argument("-n", type=int, default=20, help="Number of recent runs (default 20)")
+
+    # batch
+    batch_parser = subparsers.add_parser("batch", help="Run JSON-lines commands in one process")
+    batch_parser.add_argument("file", nargs="?", default="-", help="JSON-lines file (default: stdin)")
+    batch_parser.add_argument("--stop-on-error", action="store_true",
+                              help="Stop at the first command that fails")
+
+    return parser
+
+
+def run(argv=None):
+    """Parse argv and dispatch to the matching command handler."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
 
     if args.command is None:
         parser.print_help()
@@ -449,8 +990,80 @@ def main():
         "cart": cmd_cart,
         "resolve": cmd_resolve,
         "auth": cmd_auth,
+        "images": cmd_images,
+        "households": cmd_households,
+        "serve": cmd_serve,
+        "batch": cmd_batch,
+        "metrics": cmd_metrics,
     }
-    handlers[args.command](args)
+    from . import trace
+    sub = getattr(args, "action", None) or getattr(args, "catalog_action", None)
+    label = " ".join(a for a in [args.command, sub] if isinstance(a, str))
+    with trace.session(label, enable=args.trace):
+        _autoflush(args)
+        handlers[args.command](args)
+
+
+def _exit_code(exc: SystemExit) -> int:
+    """Map a SystemExit to a process exit code, printing string codes like sys.exit does."""
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    print(exc.code, file=sys.stderr)
+    return 1
+
+
+def run_captured(argv: list[str], func=None) -> dict:
+    """Run argv (or a zero-arg callable) in-process, capturing output and exit code.
+
+    Returns {"stdout", "stderr", "code"} — the shape used by the daemon and `grocery batch`.
+    """
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            func() if func else run(argv)
+        except SystemExit as e:
+            code = _exit_code(e)
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            code = 1
+    return {"stdout": out.getvalue(), "stderr": err.getvalue(), "code": code}
+
+
+def _parse_quietly(argv: list[str]):
+    """Parse argv without printing or exiting. Returns the namespace, or None if invalid."""
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        try:
+            return build_parser().parse_args(argv)
+        except SystemExit:
+            return None
+
+
+def _long_running(args) -> bool:
+    """Commands that run until stopped; never forwarded to the daemon or run in a batch.
+
+    Decided from the parsed namespace, so global options like --trace don't hide them.
+    """
+    return args.command == "serve" or (args.command == "list" and args.action == "watch")
+
+
+def main():
+    argv = sys.argv[1:]
+    # Help is answered locally: it needs neither the daemon nor any configuration.
+    wants_help = "-h" in argv or "--help" in argv
+    if argv and not wants_help and not os.getenv("GROCERY_NO_DAEMON"):
+        from .config import SOCKET_PATH
+        if os.path.exists(SOCKET_PATH):  # skip importing the socket client when no daemon runs
+            args = _parse_quietly(argv)  # None: invalid, run() below prints the usage error
+            if args is not None and not _long_running(args):
+                from . import server
+                code = server.forward(argv, SOCKET_PATH)
+                if code is not None:
+                    sys.exit(code)
+    run(argv)
 
 
 if __name__ == "__main__":
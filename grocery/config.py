@@ -1,9 +1,70 @@
 """Constants and paths for the grocery CLI."""
 
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+
+def _find_env_file() -> str | None:
+    """Nearest .env at or above the package directory (where load_dotenv() looked)."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _parse_env(text: str) -> dict | None:
+    """Parse simple KEY=value lines. Returns None for syntax that needs python-dotenv
+    (escapes, multi-line quoted values, ${VAR} interpolation)."""
+    values = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):].lstrip()
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        value = value.strip()
+        if value[:1] in ("'", '"'):
+            end = value.find(value[0], 1)
+            if end == -1 or "\\" in value[:end]:
+                return None
+            quote, value = value[0], value[1:end]
+        else:
+            quote, value = None, value.split(" #", 1)[0].rstrip()
+        if quote != "'" and "$" in value:
+            return None
+        values[key.strip()] = value
+    return values
+
+
+def load_env(path: str = None) -> dict:
+    """Apply .env to os.environ without overriding variables already set.
+
+    python-dotenv is imported only for files the simple parser can't read.
+    """
+    path = path or _find_env_file()
+    if not path:
+        return {}
+    try:
+        with open(path) as f:
+            values = _parse_env(f.read())
+    except OSError:
+        return {}
+    if values is None:
+        from dotenv import dotenv_values
+        values = {k: v for k, v in dotenv_values(path).items() if v is not None}
+    for name, value in values.items():
+        os.environ.setdefault(name, value)
+    return values
+
+
+load_env()
 
 TASK_LIST_ID = os.getenv("GROCERY_TASK_LIST_ID")
 PARENT_TASK_ID = os.getenv("GROCERY_PARENT_TASK_ID")
@@ -13,6 +74,49 @@ DIVISION = os.getenv("KROGER_DIVISION", "620")
 KROGER_CLIENT_ID = os.getenv("KROGER_CLIENT_ID")
 TOKEN_DIR = os.getenv("TOKEN_DIR", ".")
 
+# Resident daemon (`grocery serve`)
+SOCKET_PATH = os.getenv("GROCERY_SOCKET", os.path.join(TOKEN_DIR, ".grocery.sock"))
+LIST_CACHE_TTL = float(os.getenv("GROCERY_LIST_CACHE_TTL", "15"))
+
+# Product metadata store (`grocery catalog hydrate`)
+PRODUCTS_PATH = os.getenv("GROCERY_PRODUCTS_PATH", "./data/products.json")
+PRODUCT_TTL_DAYS = float(os.getenv("GROCERY_PRODUCT_TTL_DAYS", "7"))
+HYDRATE_WORKERS = int(os.getenv("GROCERY_HYDRATE_WORKERS", "4"))
+HYDRATE_RATE = float(os.getenv("GROCERY_HYDRATE_RATE", "5"))  # requests per second
+
+# Product image cache (`grocery images fetch`, --prefetch-images)
+IMAGE_URL = os.getenv("GROCERY_IMAGE_URL",
+                      "https://www.kroger.com/product/images/{size}/{perspective}/{upc}")
+IMAGE_CACHE_DIR = os.getenv("GROCERY_IMAGE_CACHE_DIR", "./data/images")
+IMAGE_CACHE_MAX_MB = float(os.getenv("GROCERY_IMAGE_CACHE_MAX_MB", "200"))
+IMAGE_WORKERS = int(os.getenv("GROCERY_IMAGE_WORKERS", "8"))
+
+# Background pre-resolution (`grocery list watch`)
+PRERESOLVED_PATH = os.getenv("GROCERY_PRERESOLVED_PATH", "./data/preresolved.json")
+PRERESOLVED_MAX_AGE_HOURS = float(os.getenv("GROCERY_PRERESOLVED_MAX_AGE_HOURS", "24"))
+
+# Pipelined cart sync: resolutions in flight, and resolved items per cart request
+SYNC_WORKERS = int(os.getenv("GROCERY_SYNC_WORKERS", "8"))
+CART_CHUNK = int(os.getenv("GROCERY_CART_CHUNK", "25"))
+
+# Durable queue of cart adds waiting to be pushed to Kroger
+OUTBOX_PATH = os.getenv("GROCERY_OUTBOX_PATH", "./data/outbox.json")
+# Automatic flushes back off after a failure: base delay, doubled per attempt, capped
+OUTBOX_RETRY_SECONDS = float(os.getenv("GROCERY_OUTBOX_RETRY_SECONDS", "30"))
+OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("GROCERY_OUTBOX_RETRY_MAX_SECONDS", "3600"))
+
+# Bulk list migrations (`grocery list migrate`) keep resume checkpoints here
+MIGRATIONS_DIR = os.getenv("GROCERY_MIGRATIONS_DIR", "./data/migrations")
+
+# Learned resolution memory (title -> UPC)
+MEMORY_PATH = os.getenv("GROCERY_MEMORY_PATH", "./data/resolutions.json")
+MEMORY_HALF_LIFE_DAYS = float(os.getenv("GROCERY_MEMORY_HALF_LIFE_DAYS", "60"))
+MEMORY_MIN_CONFIDENCE = float(os.getenv("GROCERY_MEMORY_MIN_CONFIDENCE", "0.6"))
+
+# Tracing (`grocery --trace` or GROCERY_TRACE=1)
+TRACE_FILE = os.getenv("GROCERY_TRACE_FILE", "./grocery-trace.json")
+METRICS_PATH = os.getenv("GROCERY_METRICS_FILE", "./data/metrics.jsonl")
+
 # Store-order categories for aisle sorting
 STORE_ORDER = [
     ("Produce", ["fruit", "vegetable", "banana", "apple", "berry", "berries", "lettuce", "tomato",
@@ -0,0 +1,134 @@
+"""Multi-household batch worker (`grocery households sync MANIFEST`).
+
+The manifest lists household configs:
+
+    {"households": [
+        {"name": "smith", "task_list_id": "...", "parent_task_id": "...",
+         "token_dir": "/srv/grocery/smith", "store_id": "70100123"},
+        ...
+    ]}
+
+The parent loads the catalog and its search index once, freezes them out of the garbage
+collector, and forks one worker process per household (a bounded pool). Forked workers
+share the catalog pages copy-on-write. Each worker points the tasklist, Kroger, memory,
+outbox and pre-resolution modules at its household's list IDs, token dir, store and data
+files before syncing, and exits afterwards, so no state leaks between households.
+
+Pushes go through the household's own outbox (`<token_dir>/outbox.json` by default), so
+a failed cart POST keeps the items queued. The next sync of that household sends them.
+"""
+
+import gc
+import json
+import multiprocessing
+import os
+import time
+
+from .config import STORE_ID
+
+REQUIRED = ("task_list_id", "parent_task_id", "token_dir")
+
+
+def load_manifest(path: str) -> list[dict]:
+    """Read and validate a manifest. Raises OSError or ValueError."""
+    with open(path) as f:
+        data = json.load(f)
+    households = data.get("households") if isinstance(data, dict) else data
+    if not isinstance(households, list) or not households:
+        raise ValueError("manifest needs a non-empty 'households' list")
+    names = set()
+    for i, household in enumerate(households, 1):
+        missing = [key for key in REQUIRED if not household.get(key)]
+        if missing:
+            raise ValueError(f"household #{i} is missing {', '.join(missing)}")
+        household.setdefault("name", f"household-{i}")
+        if household["name"] in names:
+            raise ValueError(f"duplicate household name '{household['name']}'")
+        names.add(household["name"])
+    return households
+
+
+def _configure(household: dict):
+    """Point this process's module state at one household."""
+    from . import kroger, memory, outbox, tasklist, watch
+
+    def data_file(key, name):
+        return household.get(key) or os.path.join(household["token_dir"], name)
+
+    tasklist.LIST = household["task_list_id"]
+    tasklist.PARENT = household["parent_task_id"]
+    tasklist.invalidate_cache()
+    kroger.TOKEN_DIR = household["token_dir"]
+    kroger.STORE_ID = household.get("store_id") or STORE_ID
+    kroger.reset_client()
+    memory.MEMORY_PATH = data_file("memory_path", "resolutions.json")
+    memory._memory = None
+    outbox.OUTBOX_PATH = data_file("outbox_path", "outbox.json")
+    watch.PRERESOLVED_PATH = data_file("preresolved_path", "preresolved.json")
+    watch._cache = watch._mtime = None
+
+
+def _sync_one(job: tuple[dict, bool]) -> dict:
+    """Worker entry point: sync one household's list to its cart."""
+    from . import cli, outbox, tasklist
+
+    household, dry_run = job
+    start = time.perf_counter()
+    result = {"name": household["name"], "pid": os.getpid(), "ok": False, "items": 0,
+              "resolved": 0, "unresolved": [], "pushed": 0, "error": None}
+    try:
+        _configure(household)
+        items = tasklist.get_items(include_completed=False)
+        resolved, unresolved = cli._resolve_list_items(items)
+        result.update(items=len(items), resolved=len(resolved), unresolved=unresolved)
+        if not dry_run:
+            outbox.enqueue(resolved, sync=True)
+            if outbox.has_pending():  # also retries what an earlier failed sync left queued
+                flushed = outbox.flush()
+                if flushed["error"]:
+                    raise RuntimeError(f"cart push failed, {flushed['entries']} cart add(s) kept in "
+                                       f"{outbox.OUTBOX_PATH}: {flushed['error']}")
+                result["pushed"] = flushed["items"]
+                cli.run_captured(None, func=lambda: cli._remember(flushed["flushed"]))
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _warm_shared_state():
+    """Load everything workers read but never write, then keep GC off those pages.
+
+    The caller must gc.unfreeze() once the workers are gone: in `grocery serve` this
+    process lives on, and frozen objects are never collected.
+    """
+    from . import catalog
+
+    catalog.load_catalog()  # also builds the lowercase-name and UPC indexes
+    gc.collect()
+    gc.freeze()
+
+
+def sync_all(households: list[dict], workers: int = None, dry_run: bool = False):
+    """Sync every household concurrently. Yields results as workers finish, then a summary dict."""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(households)))
+    try:
+        ctx = multiprocessing.get_context("fork")
+    except ValueError:
+        ctx = multiprocessing.get_context()  # no fork: each worker reloads the catalog
+    ok = failed = 0
+    try:
+        _warm_shared_state()
+        start = time.perf_counter()
+        with ctx.Pool(processes=workers, maxtasksperchild=1) as pool:
+            for result in pool.imap_unordered(_sync_one, [(h, dry_run) for h in households]):
+                ok += result["ok"]
+                failed += not result["ok"]
+                yield result
+    finally:
+        gc.unfreeze()
+    elapsed = time.perf_counter() - start
+    yield {"summary": True, "households": len(households), "ok": ok, "failed": failed,
+           "workers": workers, "seconds": elapsed,
+           "per_minute": len(households) / elapsed * 60 if elapsed else 0.0}
@@ -0,0 +1,157 @@
+"""Concurrent product-image prefetch into a content-addressed local cache.
+
+Images are stored once per content hash under IMAGE_CACHE_DIR/objects/, and an index maps
+"upc/perspective/size" keys to hashes. Identical images (e.g. the API's placeholder for
+products without photos) are stored once. When the cache grows past IMAGE_CACHE_MAX_MB,
+least recently used keys are dropped and unreferenced objects deleted.
+
+Downloads share one pooled HTTP session. GROCERY_IMAGE_URL can point at a local server
+for testing: it is a template with {upc}, {size} and {perspective} fields.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import jsonfile, trace
+from .config import IMAGE_URL, IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB, IMAGE_WORKERS
+
+_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp", "image/gif": "gif"}
+_lock = threading.Lock()
+_session = None
+
+
+def _index_path() -> str:
+    return os.path.join(IMAGE_CACHE_DIR, "index.json")
+
+
+def _object_path(sha: str, ext: str) -> str:
+    return os.path.join(IMAGE_CACHE_DIR, "objects", sha[:2], f"{sha}.{ext}")
+
+
+def _load_index() -> dict:
+    try:
+        with open(_index_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index: dict):
+    jsonfile.write_atomic(_index_path(), index, indent=None)
+
+
+def _get_session(workers: int):
+    """One pooled session for all downloads (keep-alive, pool sized to the workers)."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(workers, 1))
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+        _session.headers["User-Agent"] = "grocery-cli"
+    return _session
+
+
+def _download(session, url: str) -> tuple[bytes, str]:
+    with trace.span("images.download"):
+        response = session.get(url, timeout=20)
+    response.raise_for_status()
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+    if not content_type.startswith("image/"):
+        raise RuntimeError(f"not an image ({content_type or 'no content type'})")
+    return response.content, _EXTENSIONS.get(content_type, "img")
+
+
+def _store(data: bytes, ext: str) -> str:
+    sha = hashlib.sha256(data).hexdigest()
+    path = _object_path(sha, ext)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return sha
+
+
+def _evict(index: dict, max_bytes: int) -> int:
+    """Drop least recently used keys until unique objects fit in max_bytes. Returns bytes freed."""
+    sizes, refs = {}, {}
+    for entry in index.values():
+        obj = (entry["sha"], entry["ext"])
+        sizes[obj] = entry["bytes"]
+        refs[obj] = refs.get(obj, 0) + 1
+    total = sum(sizes.values())
+    freed = 0
+    for key in sorted(index, key=lambda k: index[k]["usedAt"]):
+        if total <= max_bytes:
+            break
+        entry = index.pop(key)
+        obj = (entry["sha"], entry["ext"])
+        refs[obj] -= 1
+        if refs[obj]:
+            continue
+        try:
+            os.remove(_object_path(*obj))
+        except OSError:
+            pass
+        total -= sizes[obj]
+        freed += sizes[obj]
+    return freed
+
+
+def fetch(upcs: list[str], size: str = "large", perspective: str = "front",
+          force: bool = False, workers: int = None) -> list[dict]:
+    """Make sure each UPC's image is cached locally, downloading misses concurrently.
+
+    Returns one {"upc", "path", "cached", "error"} dict per UPC, in input order.
+    """
+    workers = workers or IMAGE_WORKERS
+    index = _load_index()
+    now = time.time()
+    results = {}
+    misses = []
+    for upc in dict.fromkeys(upcs):
+        key = f"{upc}/{perspective}/{size}"
+        entry = index.get(key)
+        if entry and not force and os.path.exists(_object_path(entry["sha"], entry["ext"])):
+            entry["usedAt"] = now
+            results[upc] = {"upc": upc, "path": _object_path(entry["sha"], entry["ext"]),
+                            "cached": True, "error": None}
+        else:
+            misses.append(upc)
+    session = _get_session(workers) if misses else None
+
+    def download(upc):
+        url = IMAGE_URL.format(upc=upc, size=size, perspective=perspective)
+        try:
+            data, ext = _download(session, url)
+            sha = _store(data, ext)
+        except Exception as e:
+            return {"upc": upc, "path": None, "cached": False, "error": str(e)}
+        with _lock:
+            index[f"{upc}/{perspective}/{size}"] = {
+                "sha": sha, "ext": ext, "bytes": len(data), "fetchedAt": time.time(), "usedAt": time.time(),
+            }
+        return {"upc": upc, "path": _object_path(sha, ext), "cached": False, "error": None}
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(trace.propagate(download), misses):
+                results[result["upc"]] = result
+
+    freed = _evict(index, int(IMAGE_CACHE_MAX_MB * 1024 * 1024))
+    _save_index(index)
+    if freed:
+        # An image fetched in this call may itself have been evicted on a tiny cache.
+        for result in results.values():
+            if result["path"] and not os.path.exists(result["path"]):
+                result.update(path=None, error="evicted (cache too small)")
+    return [results[upc] for upc in dict.fromkeys(upcs)]
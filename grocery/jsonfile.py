@@ -0,0 +1,41 @@
+"""JSON files under ./data: cached loads and atomic writes.
+
+The local stores (resolution memory, pre-resolutions, product metadata) keep their data
+and its file mtime in module globals, so other modules can repoint the path or drop the
+cache by assignment. These helpers do the file side for them.
+"""
+
+import json
+import os
+
+
+def load_cached(path: str, cached, mtime: int | None, default) -> tuple:
+    """Return (data, mtime) for path, reusing `cached` unless the file changed on disk.
+
+    A missing file loads as default().
+    """
+    try:
+        current = os.stat(path).st_mtime_ns
+    except OSError:
+        current = None
+    if cached is not None and current == mtime:
+        return cached, mtime
+    if current is None:
+        return default(), None
+    with open(path) as f:
+        return json.load(f), current
+
+
+def write_atomic(path: str, data, indent: int | None = 2) -> int:
+    """Write data to a temp file and move it over path (creating its directory).
+
+    Returns the new mtime, so callers can keep their cache without a reload.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp, path)
+    return os.stat(path).st_mtime_ns
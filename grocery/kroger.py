@@ -3,25 +3,60 @@
 import json
 import os
 import sys
+import threading
+import time
 from pathlib import Path
 
+from . import trace
 from .config import STORE_ID, KROGER_CLIENT_ID, TOKEN_DIR
 
-# kroger-api library
-try:
-    from kroger_api import KrogerAPI
-except ImportError:
-    KrogerAPI = None
+# Validated client, reused for a few minutes (the library refreshes on 401 anyway)
+_CLIENT_TTL = 300
+_client = None
+_client_expires = 0.0
+# Serializes validation: concurrent callers (pipelined sync, hydrate) share one token check,
+# and the check's stdout redirect must not interleave across threads.
+_client_lock = threading.Lock()
+
+
+def _kroger_api():
+    """Import kroger-api on first use; it pulls in requests, which dominates startup."""
+    try:
+        from kroger_api import KrogerAPI
+    except ImportError:
+        raise RuntimeError("kroger-api not installed. Run: pip install kroger-api") from None
+    return KrogerAPI
 
 
 def _token_path() -> Path:
     return Path(TOKEN_DIR) / ".kroger_token_user.json"
 
 
-def get_client() -> "KrogerAPI":
-    """Get an authenticated Kroger API client with existing tokens."""
-    if KrogerAPI is None:
-        raise RuntimeError("kroger-api not installed. Run: pip install kroger-api")
+def reset_client():
+    """Forget the cached client (e.g. after re-authenticating)."""
+    global _client, _client_expires
+    _client = None
+    _client_expires = 0.0
+
+
+@trace.traced("kroger.get_client")
+def get_client():
+    """Get an authenticated Kroger API client, reusing a recently validated one."""
+    global _client, _client_expires
+    if _client is not None and time.time() < _client_expires:
+        return _client
+    with _client_lock:
+        if _client is None or time.time() >= _client_expires:
+            client = _validated_client()
+            expires_in = (client.client.token_info or {}).get("expires_in", 1800)
+            _client = client
+            _client_expires = time.time() + min(_CLIENT_TTL, max(expires_in - 60, 0))
+        return _client
+
+
+def _validated_client():
+    """Build a client from the stored token, refreshing it if the API rejects it."""
+    KrogerAPI = _kroger_api()
 
     token_file = _token_path()
     if not token_file.exists():
@@ -63,10 +98,10 @@ def get_client() -> "KrogerAPI":
                 raise RuntimeError(f"Token expired and refresh failed: {e}. Run: grocery auth")
         else:
             raise RuntimeError("Token expired. Run: grocery auth")
-
     return client
 
 
+@trace.traced("kroger.search_products")
 def search_products(query: str, limit: int = 5) -> list[dict]:
     """Search Kroger product API."""
     client = get_client()
@@ -78,6 +113,25 @@ def search_products(query: str, limit: int = 5) -> list[dict]:
     return results.get("data", [])
 
 
+# Most product IDs the API accepts in one filter.productId lookup
+PRODUCT_PAGE_SIZE = 50
+
+
+@trace.traced("kroger.get_products")
+def get_products(upcs: list[str]) -> list[dict]:
+    """Fetch product details for up to PRODUCT_PAGE_SIZE UPCs in one request."""
+    if len(upcs) > PRODUCT_PAGE_SIZE:
+        raise ValueError(f"At most {PRODUCT_PAGE_SIZE} UPCs per product lookup")
+    client = get_client()
+    results = client.product.search_products(
+        product_id=",".join(upcs),
+        location_id=STORE_ID,
+        limit=len(upcs)
+    )
+    return results.get("data", [])
+
+
+@trace.traced("kroger.add_to_cart")
 def add_to_cart(items: list[dict]) -> dict:
     """Add items to Kroger cart. Each item needs 'upc' and 'quantity'."""
     client = get_client()
@@ -88,9 +142,7 @@ def add_to_cart(items: list[dict]) -> dict:
 
 def get_auth_url() -> str:
     """Generate the Kroger OAuth authorization URL."""
-    if KrogerAPI is None:
-        raise RuntimeError("kroger-api not installed. Run: pip install kroger-api")
-    client = KrogerAPI()
+    client = _kroger_api()()
     return client.authorization.get_authorization_url(
         scope="cart.basic:write product.compact",
     )
@@ -98,8 +150,7 @@ def get_auth_url() -> str:
 
 def exchange_code(code: str):
     """Exchange an authorization code (or full redirect URL) for tokens."""
-    if KrogerAPI is None:
-        raise RuntimeError("kroger-api not installed. Run: pip install kroger-api")
+    KrogerAPI = _kroger_api()
 
     # Extract code from full URL if needed
     if "code=" in code:
@@ -113,5 +164,6 @@ def exchange_code(code: str):
     token_file = _token_path()
     with open(token_file, "w") as f:
         json.dump(token_info, f, indent=2)
+    reset_client()
 
     print(f"✓ Authenticated! Token saved to {token_file}")
@@ -0,0 +1,93 @@
+"""Learned title -> UPC memory for list resolution.
+
+Successful cart syncs and user-confirmed choices (`list add --upc`, `resolve --remember`)
+record observations for a list title. Observation weights decay with a half-life, so a
+choice that stops being repeated gradually loses confidence.
+
+Confidence for a title is best / (sum of weights + PRIOR). A single sync is not enough
+for a hit; a confirmation or two consistent syncs are.
+"""
+
+import time
+
+from . import jsonfile
+from .config import MEMORY_PATH, MEMORY_HALF_LIFE_DAYS, MEMORY_MIN_CONFIDENCE
+
+WEIGHT_SYNC = 1.0
+WEIGHT_CONFIRMED = 2.0
+PRIOR = 1.0
+
+_memory = None
+_mtime = None
+
+
+def normalize(title: str) -> str:
+    """Canonical memory key for a list title."""
+    return " ".join(title.lower().split())
+
+
+def _load() -> dict:
+    """Load and cache the memory file. Reloads if it changed on disk."""
+    global _memory, _mtime
+    _memory, _mtime = jsonfile.load_cached(MEMORY_PATH, _memory, _mtime,
+                                           lambda: {"version": 1, "titles": {}})
+    return _memory
+
+
+def _save():
+    global _mtime
+    _mtime = jsonfile.write_atomic(MEMORY_PATH, _memory)
+
+
+def _decayed(entry: dict, now: float) -> float:
+    age_days = max(now - entry["updated"], 0) / 86400
+    return entry["weight"] * 0.5 ** (age_days / MEMORY_HALF_LIFE_DAYS)
+
+
+def record(entries: list[tuple[str, str, str | None]], weight: float = WEIGHT_SYNC):
+    """Record (title, upc, name) observations and save once."""
+    if not entries:
+        return
+    memory = _load()
+    now = time.time()
+    for title, upc, name in entries:
+        key = normalize(title)
+        if not key or not upc:
+            continue
+        choices = memory["titles"].setdefault(key, {})
+        entry = choices.get(upc)
+        base = _decayed(entry, now) if entry else 0.0
+        choices[upc] = {
+            "name": name or (entry or {}).get("name") or title,
+            "weight": round(base + weight, 4),
+            "updated": now,
+        }
+    _save()
+
+
+def lookup(title: str, min_confidence: float = None) -> dict | None:
+    """Best remembered choice for a title if confident enough.
+
+    Returns {"upc", "name", "confidence"} or None.
+    """
+    if min_confidence is None:
+        min_confidence = MEMORY_MIN_CONFIDENCE
+    choices = _load()["titles"].get(normalize(title))
+    if not choices:
+        return None
+    now = time.time()
+    weights = {upc: _decayed(entry, now) for upc, entry in choices.items()}
+    best = max(weights, key=weights.get)
+    confidence = weights[best] / (sum(weights.values()) + PRIOR)
+    if confidence < min_confidence:
+        return None
+    return {"upc": best, "name": choices[best]["name"], "confidence": confidence}
+
+
+def forget(title: str) -> bool:
+    """Drop everything remembered for a title. Returns False if nothing was stored."""
+    memory = _load()
+    if memory["titles"].pop(normalize(title), None) is None:
+        return False
+    _save()
+    return True
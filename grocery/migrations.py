@@ -0,0 +1,144 @@
+"""Bulk list migrations (`grocery list migrate <name>`).
+
+A migration is a registered function over every grocery task, including completed and
+hidden ones, that returns the updates to make:
+
+    @migration("qty", "Move '(Nx)' title suffixes into QTY notes")
+    def qty(tasks):
+        return [{"id": ..., "title": "...", "notes": "..."}, ...]
+
+Updates only need the fields that change. The runner prints a diff, applies updates
+concurrently with a bound, and records each finished task in a checkpoint file. An
+interrupted run resumes where it stopped. The checkpoint is removed once a run
+completes cleanly.
+"""
+
+import json
+import os
+import re
+import time
+
+from . import jsonfile
+from .config import MIGRATIONS_DIR
+
+MIGRATIONS = {}
+
+
+def migration(name: str, description: str):
+    """Register a migration function under a CLI name."""
+    def decorator(fn):
+        MIGRATIONS[name] = {"fn": fn, "description": description}
+        return fn
+    return decorator
+
+
+# --- Registered migrations ---------------------------------------------------
+
+_QTY_SUFFIX = re.compile(r"\s*\((\d+)x\)\s*$")
+
+
+@migration("qty", "Move '(Nx)' title suffixes into QTY notes, keeping the rest of the notes")
+def qty(tasks: list[dict]) -> list[dict]:
+    from . import tasklist
+
+    updates = []
+    for task in tasks:
+        title = task.get("title", "")
+        m = _QTY_SUFFIX.search(title)
+        if not m:
+            continue
+        update = {"id": task["id"], "title": title[:m.start()].strip()}
+        notes = task.get("notes") or ""
+        merged = tasklist.merge_notes(notes, qty=int(m.group(1)))
+        if merged != notes:
+            update["notes"] = merged
+        updates.append(update)
+    return updates
+
+
+# --- Runner ------------------------------------------------------------------
+
+def _checkpoint_path(name: str) -> str:
+    return os.path.join(MIGRATIONS_DIR, f"{name}.checkpoint.json")
+
+
+def _load_checkpoint(name: str) -> dict:
+    try:
+        with open(_checkpoint_path(name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"name": name, "startedAt": time.strftime("%Y-%m-%dT%H:%M:%S"), "done": []}
+
+
+def _save_checkpoint(checkpoint: dict):
+    jsonfile.write_atomic(_checkpoint_path(checkpoint["name"]), checkpoint)
+
+
+def prepare(name: str, restart: bool = False) -> tuple[list[dict], list[dict], int]:
+    """Compute a migration's pending updates.
+
+    Returns (tasks, pending_updates, already_done) where already_done counts updates
+    skipped because a previous interrupted run checkpointed them.
+    """
+    from . import tasklist
+
+    if name not in MIGRATIONS:
+        raise ValueError(f"Unknown migration '{name}'. Available: {', '.join(sorted(MIGRATIONS))}")
+    if restart and os.path.exists(_checkpoint_path(name)):
+        os.remove(_checkpoint_path(name))
+    tasks = tasklist.get_items(include_completed=True)
+    updates = MIGRATIONS[name]["fn"](tasks)
+    done = set(_load_checkpoint(name)["done"])
+    pending = [u for u in updates if u["id"] not in done]
+    return tasks, pending, len(updates) - len(pending)
+
+
+def diff(tasks: list[dict], updates: list[dict]) -> list[str]:
+    """Human-readable before/after lines for each update."""
+    by_id = {t["id"]: t for t in tasks}
+    lines = []
+    for update in updates:
+        task = by_id.get(update["id"], {})
+        lines.append(f"  ~ {task.get('title', update['id'])}")
+        for field in ("title", "notes"):
+            if field in update and update[field] != (task.get(field) or ""):
+                old = (task.get(field) or "").replace("\n", " | ")
+                new = (update[field] or "").replace("\n", " | ")
+                lines.append(f"      - {field}: {old}")
+                lines.append(f"      + {field}: {new}")
+    return lines
+
+
+def apply(name: str, updates: list[dict], workers: int = 4, log=print) -> tuple[int, list[str]]:
+    """Apply updates concurrently, checkpointing each success. Returns (applied, errors)."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from . import tasklist, trace
+
+    checkpoint = _load_checkpoint(name)
+    applied = 0
+    errors = []
+
+    def run(update):
+        tasklist.update_item(update["id"], title=update.get("title"), notes=update.get("notes"))
+        return update
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        run_update = trace.propagate(run)
+        futures = {pool.submit(run_update, u): u for u in updates}
+        for future in as_completed(futures):
+            update = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(f"{update['id']}: {e}")
+                log(f"  x {update['id']}: {e}")
+                continue
+            # Results are collected on this thread, so the checkpoint needs no lock.
+            applied += 1
+            checkpoint["done"].append(update["id"])
+            _save_checkpoint(checkpoint)
+            log(f"  + {update.get('title') or update['id']}")
+
+    if not errors and os.path.exists(_checkpoint_path(name)):
+        os.remove(_checkpoint_path(name))
+    return applied, errors
@@ -0,0 +1,157 @@
+"""Durable local outbox for Kroger cart adds.
+
+`cart add` and `cart sync` write resolved items here before anything touches the network.
+A flush coalesces every queued entry into one quantity per UPC and sends them in a single
+cart POST. Entries queued by a list sync are keyed by task, and a later sync replaces
+them instead of adding to them, so re-running a failed sync doesn't double the cart.
+Only `cart add` entries accumulate. Entries are removed only after that POST succeeds, so an API outage or an
+expired token leaves them queued for `grocery cart flush`, or for the next command,
+which flushes the outbox first. Those automatic flushes back off exponentially after
+each failed attempt; `cart flush` always tries right away.
+
+The queue file is updated under an exclusive lock (one process at a time) and replaced
+atomically after an fsync, so concurrent `cart add` calls and crashes can't lose entries.
+"""
+
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from .config import OUTBOX_PATH, OUTBOX_RETRY_SECONDS, OUTBOX_RETRY_MAX_SECONDS
+
+
+@contextmanager
+def _locked():
+    """Hold the outbox lock for a read-modify-write (also serializes flushes)."""
+    directory = os.path.dirname(OUTBOX_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{OUTBOX_PATH}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _load() -> dict:
+    try:
+        with open(OUTBOX_PATH) as f:
+            box = json.load(f)
+    except FileNotFoundError:
+        return {"version": 1, "entries": []}
+    if not isinstance(box, dict) or not isinstance(box.get("entries"), list):
+        raise ValueError(f"{OUTBOX_PATH} is not an outbox file")
+    return box
+
+
+def _save(box: dict):
+    tmp = f"{OUTBOX_PATH}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(box, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, OUTBOX_PATH)
+
+
+def has_pending() -> bool:
+    """Cheap check used before every command. The file exists only while entries are queued."""
+    return os.path.exists(OUTBOX_PATH)
+
+
+def status() -> dict:
+    """The queue as stored: {"entries", and "lastError"/"attempts" after a failed flush}."""
+    try:
+        return _load()
+    except ValueError:
+        return {"version": 1, "entries": []}
+
+
+def next_retry(box: dict) -> float:
+    """When an automatic flush may next try (epoch seconds; 0 if nothing has failed)."""
+    if not box.get("lastError"):
+        return 0
+    attempts = max(1, box.get("attempts", 1))
+    delay = min(OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_SECONDS)
+    return box["lastError"]["at"] + delay
+
+
+def _sync_key(item: dict) -> str:
+    if item.get("task_id"):
+        return f"task:{item['task_id']}"
+    return f"title:{(item.get('original') or item['upc']).strip().lower()}"
+
+
+def enqueue(items: list[dict], sync: bool = False) -> int:
+    """Queue resolved items ({"upc", "quantity", "name", "original"}). Returns queue length.
+
+    With sync=True the items come from a list sync: each is keyed by its task_id (or
+    original title) and replaces an already queued entry with the same key.
+    """
+    if not items:
+        return len(status()["entries"])
+    now = time.time()
+    with _locked():
+        box = _load()
+        queued = {e["key"]: i for i, e in enumerate(box["entries"]) if e.get("key")}
+        for item in items:
+            entry = {
+                "id": os.urandom(6).hex(),
+                "upc": item["upc"],
+                "quantity": item.get("quantity", 1),
+                "name": item.get("name"),
+                "original": item.get("original"),
+                "queuedAt": now,
+            }
+            if not sync:
+                box["entries"].append(entry)
+                continue
+            entry["key"] = _sync_key(item)
+            if entry["key"] in queued:
+                box["entries"][queued.pop(entry["key"])] = entry
+            else:
+                box["entries"].append(entry)
+        _save(box)
+        return len(box["entries"])
+
+
+def coalesce(entries: list[dict]) -> list[dict]:
+    """One cart item per UPC with summed quantities, in first-queued order."""
+    merged = {}
+    for entry in entries:
+        item = merged.setdefault(entry["upc"], {"upc": entry["upc"], "quantity": 0,
+                                                "name": entry.get("name")})
+        item["quantity"] += entry.get("quantity", 1)
+    return list(merged.values())
+
+
+def flush() -> dict:
+    """Send every queued entry in one coalesced cart POST.
+
+    Returns {"entries", "items", "flushed", "error"}: "flushed" holds the entries that
+    were delivered (for resolution memory). On failure nothing is removed and "error"
+    carries the message; the failure is also recorded on the queue for `cart flush`.
+    """
+    from . import kroger
+
+    with _locked():
+        box = _load()
+        entries = box["entries"]
+        result = {"entries": len(entries), "items": 0, "flushed": [], "error": None}
+        if not entries:
+            return result
+        items = coalesce(entries)
+        result["items"] = len(items)
+        try:
+            kroger.add_to_cart(items)
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+            box["lastError"] = {"at": time.time(), "message": result["error"]}
+            box["attempts"] = box.get("attempts", 0) + 1
+            _save(box)
+            return result
+        os.remove(OUTBOX_PATH)
+        result["flushed"] = entries
+        return result
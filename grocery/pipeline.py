@@ -0,0 +1,92 @@
+"""Pipelined cart sync: overlap list fetch, catalog load, authentication and resolution.
+
+The serial sync waits for `gog tasks list`, loads the catalog on the first search,
+resolves items one by one and only then POSTs to the cart. Here the three independent
+startup steps run together: the list fetch, the catalog parse and (when pushing) the
+Kroger token check. Resolution starts as soon as the list and catalog are in, with up
+to SYNC_WORKERS items in flight, so API fallbacks overlap instead of queueing. Every
+CART_CHUNK resolved items are written to the outbox and flushed while later items are
+still resolving. A flush already in flight lets the next chunk grow instead of
+queueing behind it, and the remainder goes out at the end.
+
+Blocking calls (subprocess, file parse, HTTP) run in worker threads via
+asyncio.to_thread; the event loop only schedules them.
+"""
+
+import asyncio
+
+from .config import SYNC_WORKERS, CART_CHUNK
+
+
+def _push(items: list[dict]) -> dict:
+    from . import outbox
+
+    outbox.enqueue(items, sync=True)
+    return outbox.flush()
+
+
+async def _sync(resolve_fn, push: bool, workers: int, chunk: int) -> dict:
+    from . import catalog, kroger, tasklist
+
+    list_task = asyncio.create_task(asyncio.to_thread(tasklist.get_items, include_completed=False))
+    catalog_task = asyncio.create_task(asyncio.to_thread(catalog.load_catalog))
+    if push:
+        # Warm-up only: items that need the API, and the push, authenticate on demand and
+        # report failures themselves, so this task's exception is retrieved and dropped.
+        client_task = asyncio.create_task(asyncio.to_thread(kroger.get_client))
+        client_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    try:
+        items = await list_task
+    except BaseException:
+        catalog_task.cancel()
+        raise
+    result = {"items": items, "resolved": [], "unresolved": [], "pushes": []}
+    tasks = [(i, t) for i, t in enumerate(items) if t.get("title", "").strip()]
+    if not tasks:
+        catalog_task.cancel()
+        return result
+    await catalog_task
+
+    limit = asyncio.Semaphore(max(1, workers))
+
+    async def resolve(index, task):
+        async with limit:
+            return index, task, await asyncio.to_thread(resolve_fn, task)
+
+    resolved = {}
+    unresolved = {}
+    ready = []          # resolved items not yet handed to the outbox
+    in_flight = None    # the running chunk flush, if any
+
+    for next_done in asyncio.as_completed([resolve(i, t) for i, t in tasks]):
+        index, task, match = await next_done
+        if not match:
+            unresolved[index] = task["title"].strip()
+            continue
+        resolved[index] = match
+        ready.append(match)
+        if push and len(ready) >= chunk and (in_flight is None or in_flight.done()):
+            if in_flight is not None:
+                result["pushes"].append(in_flight.result())
+            in_flight = asyncio.create_task(asyncio.to_thread(_push, ready))
+            ready = []
+
+    if in_flight is not None:
+        result["pushes"].append(await in_flight)
+    if push and ready:
+        result["pushes"].append(await asyncio.to_thread(_push, ready))
+
+    result["resolved"] = [resolved[i] for i in sorted(resolved)]
+    result["unresolved"] = [unresolved[i] for i in sorted(unresolved)]
+    return result
+
+
+def sync(resolve_fn, push: bool = True, workers: int = None, chunk: int = None) -> dict:
+    """Fetch, resolve and (with push=True) cart the grocery list as a pipeline.
+
+    resolve_fn(task) -> resolution or None is called from worker threads. Returns
+    {"items", "resolved", "unresolved", "pushes"}: resolved and unresolved follow list
+    order, and pushes holds one outbox.flush() result per cart request, in order.
+    """
+    return asyncio.run(_sync(resolve_fn, push, workers or SYNC_WORKERS, chunk or CART_CHUNK))
@@ -0,0 +1,134 @@
+"""Resolution plan files: save a dry run's resolutions and push exactly those later.
+
+`cart sync --dry-run --save-plan plan.json` records every task's resolution together with
+a fingerprint of the task and the catalog version it was resolved against.
+`cart sync --plan plan.json` pushes those resolutions as planned and re-resolves a task
+only when:
+- it is new, or its title/notes changed since the plan was written
+- it was unresolved in the plan (the user may have added the product since)
+- its own title now gets a different answer from the resolution memory or the catalog
+  (`resolve --remember` / `catalog add` confirmed another product in review)
+Memory writes for other titles, like the flush of an unrelated cart add, change nothing.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from . import jsonfile
+from .config import CATALOG_PATH
+
+PLAN_VERSION = 1
+
+
+def fingerprint(task: dict) -> str:
+    """Hash of the task fields resolution depends on (title and notes)."""
+    raw = f"{task.get('title', '').strip()}\n{task.get('notes', '') or ''}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def catalog_version() -> dict:
+    try:
+        st = os.stat(CATALOG_PATH)
+    except OSError:
+        return {"path": CATALOG_PATH, "mtime_ns": None, "size": None}
+    return {"path": CATALOG_PATH, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def answer_changed(title: str, resolution: dict | None, catalog_changed: bool) -> bool:
+    """Whether resolving this title now would give a different product than `resolution`.
+
+    Follows the resolution order for this one title: its memory answer first (a cheap
+    lookup), then its catalog pick, which needs a fuzzy search and is only redone when the
+    catalog changed or the memory answer the resolution relied on is gone. Pinned results
+    never change (their UPC is in the notes, which the fingerprint covers).
+    """
+    from . import catalog, memory
+
+    if resolution and resolution["source"] == "pinned":
+        return False
+    upc = resolution["upc"] if resolution else None
+    remembered = memory.lookup(title)
+    if remembered:
+        return remembered["upc"] != upc
+    source = resolution["source"] if resolution else None
+    if source == "memory" or catalog_changed:
+        match = catalog.resolve_item(title)
+        if match:
+            return match["upc"] != upc
+        return source in ("memory", "catalog")  # nothing local any more: it goes to the API
+    return False
+
+
+def save(path: str, items: list[dict], resolved: list[dict]):
+    """Write a plan for the given list items and their resolutions (keyed by task_id)."""
+    by_task = {r["task_id"]: r for r in resolved if r.get("task_id")}
+    tasks = []
+    for item in items:
+        if not item.get("title", "").strip():
+            continue
+        tasks.append({
+            "id": item.get("id"),
+            "title": item["title"].strip(),
+            "fingerprint": fingerprint(item),
+            "resolution": by_task.get(item.get("id")),
+        })
+    plan = {
+        "version": PLAN_VERSION,
+        "createdAt": datetime.now().isoformat(timespec="seconds"),
+        "catalog": catalog_version(),
+        "tasks": tasks,
+    }
+    jsonfile.write_atomic(path, plan)
+
+
+def load(path: str) -> dict:
+    """Read a plan file. Raises OSError or ValueError if it is missing or unusable."""
+    with open(path) as f:
+        plan = json.load(f)
+    if not isinstance(plan, dict) or plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"unsupported plan format (expected version {PLAN_VERSION})")
+    return plan
+
+
+def apply(plan: dict, items: list[dict], resolve_fn) -> tuple[list, list, dict]:
+    """Resolve the current list from a plan, re-resolving what the plan can't vouch for.
+
+    resolve_fn(task) -> resolution dict or None is called for tasks not covered by the plan
+    (see the module docstring). Returns (resolved, unresolved_titles, stats) where stats
+    has reused/rechecked/changed/new/dropped counts, whether the catalog changed since the
+    plan was written, and "reresolved": titles whose resolution now differs from what the
+    user saw in the dry run.
+    """
+    planned = {t["id"]: t for t in plan.get("tasks", [])}
+    resolved, unresolved = [], []
+    stats = {"reused": 0, "rechecked": 0, "changed": 0, "new": 0, "dropped": 0, "reresolved": [],
+             "catalog_changed": plan.get("catalog") != catalog_version()}
+    seen = set()
+    for item in items:
+        title = item.get("title", "").strip()
+        if not title:
+            continue
+        entry = planned.get(item.get("id"))
+        seen.add(item.get("id"))
+        if entry and entry["fingerprint"] == fingerprint(item):
+            before = entry["resolution"]
+            if before and not answer_changed(title, before, stats["catalog_changed"]):
+                stats["reused"] += 1
+                result = before
+            else:
+                stats["rechecked"] += 1
+                result = resolve_fn(item)
+                if (result or {}).get("upc") != (before or {}).get("upc"):
+                    stats["reresolved"].append(title)
+        else:
+            stats["changed" if entry else "new"] += 1
+            stats["reresolved"].append(title)
+            result = resolve_fn(item)
+        if result:
+            resolved.append(result)
+        else:
+            unresolved.append(title)
+    stats["dropped"] = len(set(planned) - seen)
+    return resolved, unresolved, stats
@@ -0,0 +1,164 @@
+"""Local product-metadata store (brand, size, price, aisle, images) keyed by UPC.
+
+Filled by `grocery catalog hydrate`, which looks UPCs up in pages of the API's maximum
+multi-ID size, concurrently and rate limited. Entries older than PRODUCT_TTL_DAYS are
+stale; incremental runs fetch only stale or missing UPCs. UPCs the API doesn't know are
+recorded as missing so they aren't re-requested until they go stale too.
+"""
+
+import threading
+import time
+
+from . import jsonfile
+from .config import PRODUCTS_PATH, PRODUCT_TTL_DAYS, HYDRATE_WORKERS, HYDRATE_RATE
+
+_store = None
+_mtime = None
+_lock = threading.Lock()
+
+
+def _load() -> dict:
+    """Load and cache the store. Reloads if it changed on disk."""
+    global _store, _mtime
+    _store, _mtime = jsonfile.load_cached(PRODUCTS_PATH, _store, _mtime,
+                                          lambda: {"version": 1, "products": {}})
+    return _store
+
+
+def _save():
+    global _mtime
+    _mtime = jsonfile.write_atomic(PRODUCTS_PATH, _store, indent=None)
+
+
+def _compact(product: dict, now: float) -> dict:
+    """Keep the fields we display from a Kroger product payload."""
+    item = (product.get("items") or [{}])[0]
+    price = item.get("price") or {}
+    aisle = (product.get("aisleLocations") or [{}])[0]
+    images = {}
+    for img in product.get("images", []):
+        if img.get("perspective") == "front":
+            images = {size["size"]: size["url"] for size in img.get("sizes", []) if size.get("url")}
+    return {
+        "fetchedAt": now,
+        "description": product.get("description"),
+        "brand": product.get("brand"),
+        "size": item.get("size"),
+        "price": price.get("regular"),
+        "promo": price.get("promo") or None,
+        "aisle": aisle.get("description"),
+        "images": images,
+    }
+
+
+def get(upc: str) -> dict | None:
+    """Stored metadata for a UPC (possibly stale), or None if unknown or missing."""
+    entry = _load()["products"].get(upc)
+    if not entry or entry.get("missing"):
+        return None
+    return entry
+
+
+def is_stale(upc: str, now: float = None) -> bool:
+    entry = _load()["products"].get(upc)
+    if entry is None:
+        return True
+    age = (now or time.time()) - entry.get("fetchedAt", 0)
+    return age > PRODUCT_TTL_DAYS * 86400
+
+
+def remember(products: list[dict]):
+    """Store full product payloads we already have (e.g. from a text search)."""
+    store = _load()
+    now = time.time()
+    for product in products:
+        upc = product.get("upc")
+        if upc:
+            store["products"][upc] = _compact(product, now)
+    if products:
+        _save()
+
+
+class _RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def hydrate(upcs: list[str], force: bool = False, workers: int = None, rate: float = None) -> dict:
+    """Fetch metadata for stale or missing UPCs. Returns counts and any page errors."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from . import kroger, trace
+
+    store = _load()
+    now = time.time()
+    wanted = list(dict.fromkeys(upcs))
+    todo = [u for u in wanted if force or is_stale(u, now)]
+    stats = {"requested": len(wanted), "fresh": len(wanted) - len(todo), "fetched": 0,
+             "missing": 0, "pages": 0, "errors": []}
+    if not todo:
+        return stats
+
+    kroger.get_client()  # authenticate once before fanning out
+    size = kroger.PRODUCT_PAGE_SIZE
+    pages = [todo[i:i + size] for i in range(0, len(todo), size)]
+    stats["pages"] = len(pages)
+    limiter = _RateLimiter(HYDRATE_RATE if rate is None else rate)
+
+    def fetch(page):
+        limiter.wait()
+        return page, kroger.get_products(page)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers or HYDRATE_WORKERS) as pool:
+            fetch_page = trace.propagate(fetch)
+            futures = [pool.submit(fetch_page, page) for page in pages]
+            for future in as_completed(futures):
+                try:
+                    page, products = future.result()
+                except Exception as e:
+                    stats["errors"].append(str(e))
+                    continue
+                fetched_at = time.time()
+                with _lock:
+                    found = set()
+                    for product in products:
+                        upc = product.get("upc") or product.get("productId")
+                        if upc:
+                            store["products"][upc] = _compact(product, fetched_at)
+                            found.add(upc)
+                    for upc in page:
+                        if upc not in found:
+                            store["products"][upc] = {"fetchedAt": fetched_at, "missing": True}
+                    stats["fetched"] += len(found & set(page))
+                    stats["missing"] += len(set(page) - found)
+    finally:
+        _save()
+    return stats
+
+
+def describe(upc: str) -> str:
+    """One-line summary of stored metadata, or "" if the UPC isn't hydrated."""
+    entry = get(upc)
+    if not entry:
+        return ""
+    parts = [p for p in (entry.get("brand"), entry.get("size")) if p]
+    if entry.get("price") is not None:
+        price = f"${entry['price']:.2f}"
+        if entry.get("promo") and entry["promo"] != entry["price"]:
+            price += f" (sale ${entry['promo']:.2f})"
+        parts.append(price)
+    if entry.get("aisle"):
+        parts.append(entry["aisle"])
+    return " | ".join(parts)
@@ -0,0 +1,185 @@
+"""Resident daemon (`grocery serve`) that keeps catalog, Kroger client and list state warm.
+
+The daemon listens on a Unix socket. The `grocery` entry point forwards its argv to
+it when it's running and falls back to in-process execution otherwise.
+
+Protocol: one JSON line per connection each way.
+    request:  {"argv": [...], "cwd": "...", "env": {...}, "stdin": "..."}  or  {"op": "stop"}
+    response: {"stdout": "...", "stderr": "...", "code": 0}  or  {"fallback": true}
+
+The daemon only runs a request when the caller's working directory and configuration
+environment match its own, since relative paths and settings were fixed at startup.
+Anything else falls back to running in the caller's process.
+"""
+
+import io
+import json
+import os
+import socket
+import sys
+
+from .config import SOCKET_PATH, LIST_CACHE_TTL
+
+# Where the socket is and whether to use it don't change what a command does
+_ENV_IGNORED = {"GROCERY_SOCKET", "GROCERY_NO_DAEMON"}
+
+
+def _config_env(environ=None) -> dict:
+    """The environment variables that configure a command."""
+    environ = os.environ if environ is None else environ
+    return {k: v for k, v in environ.items()
+            if (k.startswith(("GROCERY_", "KROGER_")) or k in ("CATALOG_PATH", "TOKEN_DIR"))
+            and k not in _ENV_IGNORED}
+
+
+def _execute(request: dict) -> dict:
+    """Run one CLI invocation in this process, capturing its output."""
+    from . import cli
+
+    argv = request.get("argv") or []
+    if request.get("cwd") and os.path.realpath(request["cwd"]) != os.path.realpath(os.getcwd()):
+        # Relative paths (catalog, tokens) would resolve differently — let the caller run it.
+        return {"fallback": True}
+    if "env" in request and request["env"] != _config_env():
+        # Settings are read once at import; a caller with different ones runs its own.
+        return {"fallback": True}
+    args = cli._parse_quietly(argv)
+    if args is not None and args.command == "serve":
+        return {"stdout": "", "stderr": "grocery daemon is already running.\n", "code": 1}
+    if args is not None and cli._long_running(args):
+        # It would hold the daemon's only request loop forever: the caller runs it itself.
+        return {"fallback": True}
+
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(request.get("stdin") or "")
+    try:
+        return cli.run_captured(argv)
+    finally:
+        sys.stdin = stdin
+
+
+def _handle(handler):
+    """Serve one connection (handler is a socketserver.StreamRequestHandler)."""
+    line = handler.rfile.readline()
+    if not line:
+        return
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError:
+        response = {"stdout": "", "stderr": "Malformed request.\n", "code": 2}
+    else:
+        if request.get("op") == "stop":
+            handler.server.stopping = True
+            response = {"stdout": "grocery daemon stopped.\n", "stderr": "", "code": 0}
+        else:
+            response = _execute(request)
+    handler.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def _connect(path: str) -> socket.socket | None:
+    """Connect to a daemon socket, or return None if nothing is listening."""
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _request(sock: socket.socket, request: dict) -> dict:
+    with sock, sock.makefile("rwb") as f:
+        f.write(json.dumps(request).encode() + b"\n")
+        f.flush()
+        line = f.readline()
+    if not line:
+        raise ConnectionError("grocery daemon closed the connection")
+    return json.loads(line)
+
+
+def _reads_stdin(batch_args: list[str]) -> bool:
+    """True if `grocery batch` with these arguments would read commands from stdin."""
+    files = [a for a in batch_args if not a.startswith("--")]
+    return not files or files[0] == "-"
+
+
+def forward(argv: list[str], path: str = None) -> int | None:
+    """Run argv on a running daemon. Returns the exit code, or None to run in-process."""
+    sock = _connect(path or SOCKET_PATH)
+    if sock is None:
+        return None
+    request = {"argv": argv, "cwd": os.getcwd(), "env": _config_env()}
+    if argv[0] == "batch" and _reads_stdin(argv[1:]):
+        request["stdin"] = sys.stdin.read()
+    try:
+        response = _request(sock, request)
+    except (OSError, ValueError):
+        return None
+    if response.get("fallback"):
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stdout.flush()
+    return response.get("code", 0)
+
+
+def stop(path: str = None) -> bool:
+    """Ask a running daemon to exit. Returns False if none was running."""
+    sock = _connect(path or SOCKET_PATH)
+    if sock is None:
+        return False
+    _request(sock, {"op": "stop"})
+    return True
+
+
+def _warm():
+    """Load everything a typical command needs so the first request is fast too."""
+    from . import catalog, kroger, tasklist
+
+    tasklist.CACHE_TTL = LIST_CACHE_TTL
+    try:
+        catalog.load_catalog()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"  ! Catalog not loaded: {e}")
+    try:
+        kroger.get_client()
+    except RuntimeError as e:
+        print(f"  ! Kroger client not ready: {e}")
+
+
+def serve(path: str = None):
+    """Run the daemon in the foreground until stopped (Ctrl-C, SIGTERM or `serve --stop`)."""
+    path = path or SOCKET_PATH
+    existing = _connect(path)
+    if existing is not None:
+        existing.close()
+        raise RuntimeError(f"grocery daemon already running on {path}")
+    if os.path.exists(path):
+        os.unlink(path)  # stale socket from a daemon that didn't shut down cleanly
+
+    # Imported here so forwarding clients don't pay for them
+    import signal
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            _handle(self)
+
+    _warm()
+    server = socketserver.UnixStreamServer(path, Handler)
+    server.stopping = False
+    os.chmod(path, 0o600)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"-- grocery daemon listening on {path}")
+    sys.stdout.flush()
+    try:
+        while not server.stopping:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
@@ -0,0 +1,118 @@
+"""Cold-start import budget for common commands (`python -m grocery.startup_bench`).
+
+Each case runs the CLI in a fresh interpreter under `python -X importtime` and sums the
+import time spent after interpreter startup (everything up to and including `site` is
+excluded, since it depends on the Python install, not on us). A case fails if it goes
+over its budget or imports a module it has no use for, such as kroger_api for a list
+command. Exits 1 on any failure so it can gate CI.
+
+Commands run with GROCERY_NO_DAEMON=1 and a PATH holding only the Python directory, so
+nothing reaches gog or the network: a command that would shell out fails fast after
+its imports, and only import cost is measured. Run it from the directory you normally
+use the CLI in (so the catalog and data files resolve the same way).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules that must stay off the paths that don't use them
+HEAVY = ("dotenv", "thefuzz", "rapidfuzz", "kroger_api", "requests")
+NETWORK = ("kroger_api", "requests")
+
+# Only the pipelined sync needs an event loop
+ASYNC = ("asyncio", "concurrent")
+
+# (argv, import budget in ms, forbidden top-level packages)
+CASES = [
+    (["--help"], 15, HEAVY + ("grocery.config", "socket")),
+    (["list"], 25, HEAVY),
+    (["list", "migrate"], 25, HEAVY + ("concurrent",)),
+    (["search", "milk"], 60, NETWORK + ("dotenv",)),
+    (["resolve", "milk"], 60, NETWORK + ("dotenv", "concurrent")),
+    (["catalog"], 25, HEAVY),
+    # asyncio is most of this budget: it runs the pipeline, so it is allowed here only
+    (["cart", "sync", "--dry-run"], 80, NETWORK + ("dotenv", "multiprocessing")),
+    (["cart", "sync", "--plan", "plan.json"], 30, HEAVY + ASYNC),
+    (["cart", "flush", "--list"], 25, HEAVY),
+    (["images", "fetch", "0000000000000"], 160, ("kroger_api", "dotenv", "thefuzz", "asyncio")),
+    (["households", "sync", "manifest.json"], 40, HEAVY + ASYNC),
+    (["batch"], 25, HEAVY + ASYNC),
+    (["auth", "url"], 180, ("thefuzz", "rapidfuzz") + ASYNC),
+    (["metrics"], 25, HEAVY),
+]
+
+
+def _parse(stderr: str) -> tuple[float, list[tuple[str, float]]]:
+    """Return (command import ms, [(module, self ms), ...]) from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.rstrip(), int(self_us)))
+    # Interpreter startup ends with the top-level `site` import (one space = depth 0).
+    start = next((i + 1 for i, (name, _) in enumerate(rows) if name == " site"), 0)
+    modules = [(name.strip(), us / 1000) for name, us in rows[start:]]
+    return sum(ms for _, ms in modules), modules
+
+
+def measure(argv: list[str]) -> tuple[float, list[tuple[str, float]], int]:
+    """Run one CLI invocation under -X importtime. Returns (ms, modules, exit code)."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, GROCERY_NO_DAEMON="1", PATH=os.path.dirname(sys.executable))
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (root, os.environ.get("PYTHONPATH")) if p)
+    env.pop("GROCERY_TRACE", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from grocery.cli import main; main()", *argv],
+        env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        text=True,
+    )
+    ms, modules = _parse(proc.stderr)
+    return ms, modules, proc.returncode
+
+
+def _forbidden_hits(modules: list[tuple[str, float]], forbidden: tuple) -> list[str]:
+    names = {name for name, _ in modules}
+    return sorted(f for f in forbidden if f in names or any(n.startswith(f + ".") for n in names))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m grocery.startup_bench",
+                                     description="Check per-command cold-start import budgets")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest counts (default 3)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply every budget (e.g. 2 on a slow CI machine)")
+    parser.add_argument("--top", type=int, default=0, help="Show the N slowest imports per case")
+    args = parser.parse_args(argv)
+
+    print(f"-- Startup import budget (best of {args.repeat}, interpreter startup excluded):\n")
+    failures = []
+    for case_argv, budget, forbidden in CASES:
+        label = " ".join(case_argv)
+        runs = [measure(case_argv) for _ in range(max(1, args.repeat))]
+        ms, modules, code = min(runs, key=lambda r: r[0])
+        limit = budget * args.scale
+        hits = _forbidden_hits(modules, forbidden)
+        ok = ms <= limit and not hits
+        print(f"  {'+' if ok else 'x'} {label:<32} {ms:7.1f} ms / {limit:.0f} ms  (exit {code})")
+        if hits:
+            print(f"      imports {', '.join(hits)}")
+        if ms > limit:
+            failures.append(f"{label}: {ms:.1f} ms over the {limit:.0f} ms budget")
+        failures += [f"{label}: imports {hit}" for hit in hits]
+        for name, self_ms in sorted(modules, key=lambda m: -m[1])[:args.top]:
+            print(f"      {self_ms:6.1f} ms  {name}")
+    print()
+    if failures:
+        print(f"x {len(failures)} startup regression(s):")
+        for failure in failures:
+            print(f"  • {failure}")
+        return 1
+    print("+ All commands within budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
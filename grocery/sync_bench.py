@@ -0,0 +1,209 @@
+"""End-to-end cart sync benchmark with simulated latency (`python -m grocery.sync_bench`).
+
+Compares the serial sync (fetch list, then resolve items one by one, then push) with
+the pipelined one in grocery.pipeline, on a synthetic list and catalog. Everything runs
+in a temporary directory, and nothing touches Google Tasks, Kroger or your data files:
+- `gog` is a stub script on PATH that sleeps before printing the list, so each call
+  pays real subprocess startup plus the simulated latency
+- the Kroger client is a stub whose token check, product search and cart POST sleep
+- the catalog is a generated JSON file parsed for real, and fuzzy matching is real
+
+Both modes must resolve the same UPCs; the benchmark fails otherwise.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+_WORDS = ("organic", "whole", "large", "fresh", "greek", "honey", "roasted", "sharp",
+          "low", "fat", "wheat", "sea", "salt", "vanilla", "chicken", "baby", "green",
+          "sweet", "spicy", "classic", "red", "white", "dark", "light", "frozen", "sliced")
+_NOUNS = ("milk", "bread", "eggs", "yogurt", "cheddar", "almonds", "coffee", "spinach",
+          "butter", "tortillas", "salsa", "apples", "pasta", "rice", "beans", "oats",
+          "granola", "crackers", "chips", "juice", "tea", "soup", "turkey", "salmon")
+
+_GOG = '''#!{python}
+import json, sys, time
+time.sleep({delay})
+args = [a for a in sys.argv[1:] if a != "--json"]
+if args[:2] != ["tasks", "list"]:
+    sys.exit("stub gog only supports 'tasks list'")
+with open({tasks!r}) as f:
+    sys.stdout.write(f.read())
+'''
+
+
+def _fake_kroger(auth_s: float, search_s: float, cart_s: float, posts: list):
+    """A stand-in for kroger_api.KrogerAPI whose network calls only sleep."""
+
+    def search_products(term=None, location_id=None, limit=1, **_):
+        time.sleep(search_s)
+        upc = f"9{abs(hash(term)) % 10**12:012d}"
+        return {"data": [{"upc": upc, "description": term.title()}]}
+
+    def add_to_cart(items):
+        time.sleep(cart_s)
+        posts.append(items)
+        return {}
+
+    class FakeKrogerAPI:
+        def __init__(self):
+            self.client = SimpleNamespace(token_info=None, token_file=None)
+            self.product = SimpleNamespace(search_products=search_products)
+            self.cart = SimpleNamespace(add_to_cart=add_to_cart)
+
+        def test_current_token(self):
+            time.sleep(auth_s)
+            return True
+
+    return FakeKrogerAPI
+
+
+def _build(root: str, args) -> dict:
+    """Write the synthetic catalog, task list, token and gog stub. Returns counts."""
+    rng = random.Random(7)
+    names = set()
+    while len(names) < args.catalog:
+        names.add(" ".join(rng.sample(_WORDS, 2) + [rng.choice(_NOUNS)]))
+    catalog = [{"upc": f"{i:013d}", "name": name.title(), "purchaseCount": rng.randint(1, 40)}
+               for i, name in enumerate(sorted(names), 1)]
+    with open(os.path.join(root, "catalog.json"), "w") as f:
+        json.dump({"items": catalog}, f)
+
+    n_api = round(args.items * args.api_share)
+    n_pinned = round(args.items * args.pinned_share)
+    tasks = []
+    for i in range(args.items):
+        product = rng.choice(catalog)
+        if i < n_pinned:
+            task = {"title": product["name"].lower(), "notes": f"UPC:{product['upc']}"}
+        elif i < n_pinned + n_api:
+            task = {"title": f"qxz{i} vrkt"}  # matches nothing: API fallback
+        else:
+            task = {"title": product["name"].lower()}
+        tasks.append({"id": f"t{i}", "parent": "P", "status": "needsAction", **task})
+    rng.shuffle(tasks)
+    tasks_path = os.path.join(root, "tasks.json")
+    with open(tasks_path, "w") as f:
+        json.dump({"tasks": tasks}, f)
+
+    bin_dir = os.path.join(root, "bin")
+    os.makedirs(bin_dir)
+    gog = os.path.join(bin_dir, "gog")
+    with open(gog, "w") as f:
+        f.write(_GOG.format(python=sys.executable, delay=args.gog_ms / 1000, tasks=tasks_path))
+    os.chmod(gog, 0o755)
+    with open(os.path.join(root, ".kroger_token_user.json"), "w") as f:
+        json.dump({"access_token": "bench", "expires_in": 1800}, f)
+    return {"pinned": n_pinned, "api": n_api, "catalog": args.items - n_pinned - n_api}
+
+
+def _point_at(root: str, fake_api):
+    """Aim every module the sync touches at the sandbox."""
+    from . import catalog, kroger, memory, outbox, tasklist, watch
+
+    os.environ["PATH"] = os.path.join(root, "bin") + os.pathsep + os.environ.get("PATH", "")
+    tasklist.LIST, tasklist.PARENT = "L", "P"
+    catalog.CATALOG_PATH = os.path.join(root, "catalog.json")
+    memory.MEMORY_PATH = os.path.join(root, "resolutions.json")
+    outbox.OUTBOX_PATH = os.path.join(root, "outbox.json")
+    watch.PRERESOLVED_PATH = os.path.join(root, "preresolved.json")
+    kroger.TOKEN_DIR = root
+    kroger._kroger_api = lambda: fake_api
+
+
+def _cold():
+    """Drop every warm cache so each run starts like a fresh CLI invocation."""
+    from . import catalog, kroger, memory, tasklist, watch
+
+    catalog._catalog = catalog._mtime = None
+    memory._memory = memory._mtime = None
+    watch._cache = watch._mtime = None
+    tasklist.invalidate_cache()
+    kroger.reset_client()
+
+
+def _serial(resolve_fn) -> list[dict]:
+    """The sync as it ran before grocery.pipeline: strictly one step after another."""
+    from . import cli, outbox, tasklist
+
+    items = tasklist.get_items(include_completed=False)
+    resolved = [r for r in (resolve_fn(t) for t in items if t.get("title", "").strip()) if r]
+    cli._queue_cart_adds(resolved, sync=True)
+    outbox.flush()
+    return resolved
+
+
+def _pipelined(resolve_fn, workers: int, chunk: int) -> list[dict]:
+    from . import pipeline
+
+    return pipeline.sync(resolve_fn, push=True, workers=workers, chunk=chunk)["resolved"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m grocery.sync_bench",
+                                     description="Serial vs pipelined cart sync under simulated latency")
+    parser.add_argument("--items", type=int, default=30, help="List items (default 30)")
+    parser.add_argument("--catalog", type=int, default=3000, help="Catalog products (default 3000)")
+    parser.add_argument("--pinned-share", type=float, default=0.4, help="Share with a pinned UPC (default 0.4)")
+    parser.add_argument("--api-share", type=float, default=0.2, help="Share needing the product API (default 0.2)")
+    parser.add_argument("--gog-ms", type=float, default=600, help="gog list latency (default 600)")
+    parser.add_argument("--auth-ms", type=float, default=400, help="Token check latency (default 400)")
+    parser.add_argument("--search-ms", type=float, default=300, help="Product search latency (default 300)")
+    parser.add_argument("--cart-ms", type=float, default=250, help="Cart POST latency (default 250)")
+    parser.add_argument("--workers", type=int, help="Pipeline resolutions in flight (default: GROCERY_SYNC_WORKERS)")
+    parser.add_argument("--chunk", type=int, help="Items per cart request (default: GROCERY_CART_CHUNK)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the median counts (default 3)")
+    args = parser.parse_args(argv)
+
+    from . import cli
+
+    root = tempfile.mkdtemp(prefix="grocery-sync-bench-")
+    path = os.environ.get("PATH", "")
+    posts = []
+    try:
+        counts = _build(root, args)
+        _point_at(root, _fake_kroger(args.auth_ms / 1000, args.search_ms / 1000,
+                                     args.cart_ms / 1000, posts))
+        print(f"-- Cart sync benchmark: {args.items} items ({counts['pinned']} pinned, "
+              f"{counts['catalog']} catalog, {counts['api']} API), {args.catalog} catalog products")
+        print(f"   Simulated latency: gog list {args.gog_ms:.0f} ms, token check {args.auth_ms:.0f} ms, "
+              f"product search {args.search_ms:.0f} ms, cart POST {args.cart_ms:.0f} ms\n")
+
+        modes = {
+            "serial": lambda: _serial(cli._resolve_task),
+            "pipeline": lambda: _pipelined(cli._resolve_task, args.workers, args.chunk),
+        }
+        times = {name: [] for name in modes}
+        upcs = {}
+        for _ in range(max(1, args.repeat)):
+            for name, run in modes.items():  # interleaved so drift hits both modes alike
+                _cold()
+                start = time.perf_counter()
+                resolved = run()
+                times[name].append((time.perf_counter() - start) * 1000)
+                upcs[name] = sorted(r["upc"] for r in resolved)
+
+        serial, piped = statistics.median(times["serial"]), statistics.median(times["pipeline"])
+        print(f"  serial    {serial:8.0f} ms")
+        print(f"  pipeline  {piped:8.0f} ms")
+        print(f"  speedup   {serial / piped:8.2f}x  (median of {max(1, args.repeat)}, {len(posts)} cart requests in total)\n")
+        if upcs["serial"] != upcs["pipeline"]:
+            print("x Serial and pipelined syncs resolved different UPCs.")
+            return 1
+        print(f"+ Both modes resolved the same {len(upcs['serial'])} item(s).")
+        return 0
+    finally:
+        os.environ["PATH"] = path
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
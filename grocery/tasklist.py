@@ -2,12 +2,18 @@
 
 import json
 import subprocess
-from thefuzz import fuzz
+import time
+from . import trace
 from .config import TASK_LIST_ID, PARENT_TASK_ID, get_aisle_index
 
 LIST = TASK_LIST_ID
 PARENT = PARENT_TASK_ID
 
+# Seconds a fetched list stays valid for callers that accept a cached copy. 0 disables
+# caching; `grocery serve` raises it.
+CACHE_TTL = 0.0
+_items_cache = {}
+
 
 def parse_notes(notes: str) -> dict:
     """Extract structured fields from task notes. Returns dict with 'upc' and 'qty'."""
@@ -36,12 +42,26 @@ def build_notes(upc: str = None, qty: int = None) -> str:
     return "\n".join(parts) if parts else ""
 
 
+def merge_notes(notes: str, upc: str = None, qty: int = None) -> str:
+    """Rewrite the UPC:/QTY: lines of existing notes, keeping every other line.
+
+    upc/qty of None keep the current value. Structured lines come first, as in build_notes.
+    """
+    current = parse_notes(notes)
+    head = build_notes(upc=upc or current["upc"], qty=current["qty"] if qty is None else qty)
+    other = [line for line in (notes or "").split("\n")
+             if not line.strip().startswith(("UPC:", "QTY:"))]
+    rest = "\n".join(other).strip("\n")
+    return "\n".join(part for part in (head, rest) if part)
+
+
 def _run_gog(*args, parse_json=True) -> dict | str:
     """Run a gog tasks command and return parsed output."""
     cmd = ["gog", "tasks"] + list(args)
     if parse_json and "--json" not in args:
         cmd.append("--json")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    with trace.span(f"gog {args[0]}"):
+        result = subprocess.run(cmd, capture_output=True, text=True)
     if result.returncode != 0:
         stderr = result.stderr.strip()
         raise RuntimeError(f"gog tasks failed: {stderr or result.stdout.strip()}")
@@ -50,14 +70,30 @@ def _run_gog(*args, parse_json=True) -> dict | str:
     return result.stdout
 
 
-def get_items(include_completed=False) -> list[dict]:
-    """Fetch grocery list items (sub-tasks of PARENT only)."""
+def invalidate_cache():
+    """Drop cached list state (called after every mutation)."""
+    _items_cache.clear()
+
+
+def get_items(include_completed=False, cached=False) -> list[dict]:
+    """Fetch grocery list items (sub-tasks of PARENT only).
+
+    With cached=True a list fetched within CACHE_TTL seconds may be reused. Only the
+    mutation helpers accept that: viewing and syncing the list always refetch, since a
+    partner may have added items in the Tasks app since.
+    """
+    hit = _items_cache.get(include_completed)
+    if cached and hit and time.monotonic() - hit[0] < CACHE_TTL:
+        return list(hit[1])
     args = ["list", LIST]
     if include_completed:
         args += ["--show-completed", "--show-hidden"]
     data = _run_gog(*args)
     tasks = data.get("tasks", [])
-    return [t for t in tasks if t.get("parent") == PARENT]
+    items = [t for t in tasks if t.get("parent") == PARENT]
+    if CACHE_TTL > 0:
+        _items_cache[include_completed] = (time.monotonic(), items)
+    return list(items)
 
 
 def add_item(title: str, previous_id: str = None, notes: str = None) -> dict:
@@ -74,20 +110,36 @@ def add_item(title: str, previous_id: str = None, notes: str = None) -> dict:
     if notes:
         args += ["--notes", notes]
     data = _run_gog(*args)
+    invalidate_cache()
     return data.get("task", data)
 
 
-def add_items_sorted(titles: list[str], notes_map: dict = None) -> list[dict]:
+def update_item(task_id: str, title: str = None, notes: str = None) -> dict:
+    """Update a task's title and/or notes. Returns the updated task dict."""
+    args = ["update", LIST, task_id]
+    if title is not None:
+        args += ["--title", title]
+    if notes is not None:
+        args += ["--notes", notes]
+    data = _run_gog(*args)
+    invalidate_cache()
+    return data.get("task", data)
+
+
+def add_items_sorted(titles: list[str], notes_map: dict = None) -> list[dict | RuntimeError]:
     """Add multiple items, inserting each in the correct aisle-order position.
     
     Args:
         titles: List of item titles to add
         notes_map: Optional dict mapping title -> notes string (e.g. UPC metadata)
+
+    Returns the added task, or the RuntimeError of a failed gog call, per title in input
+    order. A failed add doesn't stop the titles after it.
     """
     if notes_map is None:
         notes_map = {}
     
-    current = get_items(include_completed=False)
+    current = get_items(include_completed=False, cached=True)
     
     current_indexed = [(t.get("title", ""), get_aisle_index(t.get("title", "")), t["id"]) for t in current if t.get("title")]
     current_indexed.sort(key=lambda x: (x[1], x[0].lower()))
@@ -106,7 +158,11 @@ def add_items_sorted(titles: list[str], notes_map: dict = None) -> list[dict]:
                 break
         
         notes = notes_map.get(title)
-        task = add_item(title, previous_id=previous_id, notes=notes)
+        try:
+            task = add_item(title, previous_id=previous_id, notes=notes)
+        except RuntimeError as e:
+            added.append(e)
+            continue
         task_id = task.get("id")
         added.append(task)
         
@@ -123,6 +179,8 @@ def add_items_sorted(titles: list[str], notes_map: dict = None) -> list[dict]:
 
 def _fuzzy_find(name: str, items: list[dict]) -> dict | None:
     """Find best fuzzy match for name in items list."""
+    from thefuzz import fuzz
+
     best = None
     best_score = 0
     for item in items:
@@ -137,40 +195,74 @@ def _fuzzy_find(name: str, items: list[dict]) -> dict | None:
     return None
 
 
+def _act_on_matches(titles: list[str], gog_verb: str, *extra) -> list[str | Exception]:
+    """Fuzzy-match each title against one fetch of the active list and run a gog verb on it.
+
+    Returns, in input order, the matched title, a ValueError for titles with no match, or
+    the RuntimeError of a gog call that failed (the titles after it still run). A task
+    matched once is not matched again by a later title.
+    """
+    pool = get_items(include_completed=False, cached=True)
+    results = []
+    try:
+        for title in titles:
+            match = _fuzzy_find(title, pool)
+            if not match:
+                results.append(ValueError(f"No matching item found for '{title}'"))
+                continue
+            try:
+                _run_gog(gog_verb, LIST, match["id"], *extra, parse_json=(gog_verb != "delete"))
+            except RuntimeError as e:
+                results.append(e)
+                continue
+            pool = [t for t in pool if t["id"] != match["id"]]
+            results.append(match["title"])
+    finally:
+        invalidate_cache()
+    return results
+
+
+def remove_items(titles: list[str]) -> list[str | Exception]:
+    """Remove several items with a single list fetch. See _act_on_matches."""
+    return _act_on_matches(titles, "delete", "--force")
+
+
+def check_items(titles: list[str]) -> list[str | Exception]:
+    """Mark several items completed with a single list fetch. See _act_on_matches."""
+    return _act_on_matches(titles, "done")
+
+
 def remove_item(title: str) -> str:
     """Remove item by fuzzy-matched title. Returns removed title."""
-    items = get_items(include_completed=False)
-    match = _fuzzy_find(title, items)
-    if not match:
-        raise ValueError(f"No matching item found for '{title}'")
-    _run_gog("delete", LIST, match["id"], "--force", parse_json=False)
-    return match["title"]
+    result = remove_items([title])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
 
 
 def check_item(title: str) -> str:
     """Mark item as completed. Returns matched title."""
-    items = get_items(include_completed=False)
-    match = _fuzzy_find(title, items)
-    if not match:
-        raise ValueError(f"No matching item found for '{title}'")
-    _run_gog("done", LIST, match["id"])
-    return match["title"]
+    result = check_items([title])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
 
 
 def uncheck_item(title: str) -> str:
     """Mark completed item as active again. Returns matched title."""
-    items = get_items(include_completed=True)
+    items = get_items(include_completed=True, cached=True)
     completed = [t for t in items if t.get("status") == "completed"]
     match = _fuzzy_find(title, completed)
     if not match:
         raise ValueError(f"No matching completed item found for '{title}'")
     _run_gog("undo", LIST, match["id"])
+    invalidate_cache()
     return match["title"]
 
 
 def clear_completed() -> int:
     """Delete all completed sub-tasks of parent. Returns count deleted."""
-    items = get_items(include_completed=True)
+    items = get_items(include_completed=True, cached=True)
     completed = [t for t in items if t.get("status") == "completed"]
     count = 0
     for item in completed:
@@ -179,4 +271,5 @@ def clear_completed() -> int:
             count += 1
         except RuntimeError:
             pass
+    invalidate_cache()
     return count
@@ -0,0 +1,227 @@
+"""Timing spans for every phase of a command.
+
+Enabled with `grocery --trace <command>` or GROCERY_TRACE=1. A traced run:
+    - prints a timing tree to stderr
+    - writes Chrome trace-event JSON (open in chrome://tracing or ui.perfetto.dev)
+    - appends one line of per-span counters and latency histograms to the metrics file
+
+When tracing is off, span() returns a shared no-op and @traced adds one flag check.
+
+The current span lives in a context variable, so work handed to asyncio.to_thread nests
+under the span that started it. Thread pools get the same by submitting propagate(fn).
+"""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+from .config import TRACE_FILE, METRICS_PATH
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000, 5000]
+
+_enabled = False
+_lock = threading.Lock()
+_current = contextvars.ContextVar("grocery_trace_span", default=None)
+_roots = []
+_t0 = 0.0
+
+
+class _Span:
+    __slots__ = ("name", "start", "end", "children", "tid", "_token")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.children = []
+        self.tid = threading.get_ident()
+
+    def __enter__(self):
+        parent = _current.get()
+        with _lock:  # worker threads add children to a shared parent
+            (parent.children if parent else _roots).append(self)
+        self._token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.end = time.perf_counter()
+        _current.reset(self._token)
+        return False
+
+    @property
+    def ms(self) -> float:
+        return (self.end - self.start) * 1000
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def span(name: str):
+    """Context manager timing a block under the current span."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name)
+
+
+def traced(name: str):
+    """Decorator timing every call of a function as a span."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def propagate(fn):
+    """Wrap fn for a thread pool so spans it opens nest under the caller's current span.
+
+    Each call runs in its own copy of the caller's context (asyncio.to_thread already
+    does this, plain executors don't).
+    """
+    if not _enabled:
+        return fn
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+class session:
+    """Trace one command. Nested sessions (e.g. commands inside `grocery batch`) become spans."""
+
+    def __init__(self, label: str, enable: bool = False):
+        self.label = label
+        self.owner = False
+        if not _enabled and (enable or os.getenv("GROCERY_TRACE")):
+            self.owner = True
+
+    def __enter__(self):
+        global _enabled, _t0
+        if self.owner:
+            _roots.clear()
+            self.token = _current.set(None)
+            _t0 = time.perf_counter()
+            _enabled = True
+        self.span = span(self.label)
+        self.span.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        global _enabled
+        self.span.__exit__(*exc)
+        if self.owner:
+            _enabled = False
+            _current.reset(self.token)
+            try:
+                report(self.label, self.span)
+            except OSError as e:
+                print(f"  ! Trace not saved: {e}", file=sys.stderr)
+        return False
+
+
+def _merged(children: list) -> list[tuple[str, int, float, list]]:
+    """Group sibling spans by name: (name, count, total_ms, grandchildren)."""
+    groups = {}
+    for child in children:
+        name, count, total, kids = groups.get(child.name, (child.name, 0, 0.0, []))
+        groups[child.name] = (name, count + 1, total + child.ms, kids + child.children)
+    return list(groups.values())
+
+
+def _print_tree(nodes: list, depth: int = 1):
+    for name, count, total, kids in _merged(nodes):
+        label = f"{name} x{count}" if count > 1 else name
+        print(f"{'  ' * depth}{label:<{44 - 2 * depth}} {total:>9.1f} ms", file=sys.stderr)
+        _print_tree(kids, depth + 1)
+
+
+def _walk(nodes: list):
+    for node in nodes:
+        yield node
+        yield from _walk(node.children)
+
+
+def _chrome_events(label: str) -> dict:
+    pid = os.getpid()
+    events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"grocery {label}"}}]
+    for node in _walk(_roots):
+        events.append({
+            "name": node.name, "ph": "X", "pid": pid, "tid": node.tid,
+            "ts": round((node.start - _t0) * 1e6, 1), "dur": round((node.end - node.start) * 1e6, 1),
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _metrics(label: str, total_ms: float) -> dict:
+    spans = {}
+    for node in _walk(_roots):
+        m = spans.setdefault(node.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                         "hist": [0] * (len(BUCKETS_MS) + 1)})
+        m["count"] += 1
+        m["total_ms"] += node.ms
+        m["max_ms"] = max(m["max_ms"], node.ms)
+        bucket = next((i for i, bound in enumerate(BUCKETS_MS) if node.ms <= bound), len(BUCKETS_MS))
+        m["hist"][bucket] += 1
+    for m in spans.values():
+        m["total_ms"] = round(m["total_ms"], 3)
+        m["max_ms"] = round(m["max_ms"], 3)
+    return {"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "command": label,
+            "total_ms": round(total_ms, 3), "buckets_ms": BUCKETS_MS, "spans": spans}
+
+
+def report(label: str, root: _Span):
+    """Print the timing tree and persist the trace and metrics for the finished session.
+
+    The total is the session span's wall time. Spans opened by threads that didn't inherit
+    the session's context still show up as extra roots, but don't count towards it.
+    """
+    total = root.ms
+    print(f"\n-- Trace: {label} ({total:.1f} ms)", file=sys.stderr)
+    _print_tree(_roots)
+
+    with open(TRACE_FILE, "w") as f:
+        json.dump(_chrome_events(label), f)
+    metrics_dir = os.path.dirname(METRICS_PATH)
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+    with open(METRICS_PATH, "a") as f:
+        f.write(json.dumps(_metrics(label, total)) + "\n")
+    print(f"   Chrome trace: {TRACE_FILE} | Metrics: {METRICS_PATH}", file=sys.stderr)
+
+
+def load_metrics(command: str = None) -> list[dict]:
+    """Read recorded runs from the metrics file, oldest first."""
+    if not os.path.exists(METRICS_PATH):
+        return []
+    runs = []
+    with open(METRICS_PATH) as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if command is None or run.get("command") == command:
+                runs.append(run)
+    return runs
@@ -0,0 +1,129 @@
+"""Background pre-resolution of list items (`grocery list watch`).
+
+The watcher polls the list, detects tasks that are new or whose title/notes changed,
+resolves just those, and stores the results keyed by task ID and fingerprint. At sync
+time `_resolve_task` takes a cached resolution whenever the task is unchanged and the
+entry is younger than PRERESOLVED_MAX_AGE_HOURS, so nothing is left to resolve. A
+matched (not pinned) entry also goes stale once its own title gets a different answer
+from the resolution memory or the catalog, so the next poll picks up a product
+confirmed since then. Unrelated memory writes leave it alone.
+
+Polling backs off exponentially while the list is idle and resets after a change. After
+a change it waits for the list to settle, so a burst of edits is resolved once.
+"""
+
+import time
+
+from . import jsonfile
+from .config import PRERESOLVED_PATH, PRERESOLVED_MAX_AGE_HOURS
+from .plan import answer_changed, catalog_version, fingerprint
+
+# Resolution sources `--pin` writes into notes: both only match above their thresholds
+PIN_SOURCES = ("catalog", "memory")
+
+_cache = None
+_mtime = None
+
+
+def _load() -> dict:
+    """Load and cache the pre-resolution file. Reloads if it changed on disk."""
+    global _cache, _mtime
+    _cache, _mtime = jsonfile.load_cached(PRERESOLVED_PATH, _cache, _mtime,
+                                          lambda: {"version": 1, "tasks": {}})
+    return _cache
+
+
+def _save():
+    global _mtime
+    _mtime = jsonfile.write_atomic(PRERESOLVED_PATH, _cache)
+
+
+def _fresh(entry: dict | None, task: dict, now: float) -> bool:
+    if not entry or entry["fingerprint"] != fingerprint(task) \
+            or now - entry["resolvedAt"] >= PRERESOLVED_MAX_AGE_HOURS * 3600:
+        return False
+    return not answer_changed(task.get("title", "").strip(), entry["resolution"],
+                              entry.get("catalog") != catalog_version())
+
+
+def lookup(task: dict) -> dict | None:
+    """Cached resolution for an unchanged task, or None if it must be resolved now."""
+    try:
+        entry = _load()["tasks"].get(task.get("id"))
+    except (OSError, ValueError):
+        return None
+    if not _fresh(entry, task, time.time()) or not entry["resolution"]:
+        return None
+    return dict(entry["resolution"])
+
+
+def _snapshot(items: list[dict]) -> dict:
+    return {t.get("id"): fingerprint(t) for t in items if t.get("title", "").strip()}
+
+
+def _stale(items: list[dict], now: float) -> list[dict]:
+    tasks = _load()["tasks"]
+    return [t for t in items if t.get("title", "").strip() and not _fresh(tasks.get(t.get("id")), t, now)]
+
+
+def refresh(items: list[dict], resolve_fn, pin: bool = False, log=print) -> int:
+    """Resolve tasks that are new, changed or expired; drop tasks no longer listed.
+
+    resolve_fn(task) -> resolution or None. With pin=True, UPCs matched from the catalog
+    or the resolution memory are written into the task notes. API fallbacks are never
+    pinned, since nobody has confirmed them yet. Returns the number of tasks resolved.
+    """
+    from . import tasklist
+
+    now = time.time()
+    cache = _load()
+    todo = _stale(items, now)
+    for task in todo:
+        result = resolve_fn(task)
+        pinned = ""
+        if result and pin and result["source"] in PIN_SOURCES:
+            notes = tasklist.merge_notes(task.get("notes", ""), upc=result["upc"])
+            tasklist.update_item(task["id"], notes=notes)
+            task = {**task, "notes": notes}
+            pinned = ", UPC pinned"
+        cache["tasks"][task["id"]] = {"fingerprint": fingerprint(task), "resolution": result,
+                                      "resolvedAt": now, "catalog": catalog_version()}
+        if result:
+            log(f"  + {task['title'].strip()} -> {result['name']} (UPC: {result['upc']}, {result['source']}{pinned})")
+        else:
+            log(f"  x {task['title'].strip()} -> No match found (will retry at sync)")
+    listed = {t.get("id") for t in items}
+    dropped = [tid for tid in cache["tasks"] if tid not in listed]
+    for tid in dropped:
+        del cache["tasks"][tid]
+    if todo or dropped:
+        _save()
+    return len(todo)
+
+
+def watch(resolve_fn, interval: float = 30, max_interval: float = 300, settle: float = 5,
+          pin: bool = False, once: bool = False, log=print):
+    """Poll the list forever (or once), pre-resolving new and changed items."""
+    from . import tasklist
+
+    delay = interval
+    while True:
+        try:
+            items = tasklist.get_items(include_completed=False)
+            if _stale(items, time.time()) and not once:
+                # Coalesce a burst of edits: wait until two polls agree.
+                while True:
+                    time.sleep(settle)
+                    again = tasklist.get_items(include_completed=False)
+                    if _snapshot(again) == _snapshot(items):
+                        break
+                    items = again
+            stamp = time.strftime("%H:%M:%S")
+            count = refresh(items, resolve_fn, pin=pin, log=lambda line: log(f"[{stamp}]{line}"))
+            delay = interval if count else min(delay * 2, max_interval)
+        except RuntimeError as e:
+            log(f"[{time.strftime('%H:%M:%S')}]  ! Poll failed: {e}")
+            delay = min(delay * 2, max_interval)
+        if once:
+            return
+        time.sleep(delay)